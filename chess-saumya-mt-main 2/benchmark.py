@@ -0,0 +1,106 @@
+import json
+import sys
+import time
+import chess
+import killbill
+
+# Known perft node counts used to check move generation: (name, FEN, depth, nodes)
+PERFT_CASES = [
+    ("startpos", chess.STARTING_FEN, 3, 8902),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", 2, 2039),
+    ("endgame", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", 4, 43238),
+]
+
+
+def perft(board, depth):
+    '''
+    Counts the leaf nodes of the legal move tree of the board to the given depth.
+    '''
+    if depth == 0:
+        return 1
+    if depth == 1:
+        return board.legal_moves.count()
+    nodes = 0
+    for move in board.legal_moves:
+        board.push(move)
+        nodes += perft(board, depth - 1)
+        board.pop()
+    return nodes
+
+
+def rate(function, items, min_time=1.0):
+    '''
+    Calls function on every item, repeating the whole list for at least min_time seconds, and
+    returns the number of calls per second.
+    '''
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for item in items:
+            function(item)
+        calls += len(items)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls / elapsed
+
+
+def run_benchmarks(depth):
+    '''
+    Runs every benchmark and returns the results as a dict of name -> value. Rates are per second.
+    '''
+    results = {}
+    for name, fen, perft_depth, expected in PERFT_CASES:
+        start = time.perf_counter()
+        nodes = perft(chess.Board(fen), perft_depth)
+        elapsed = time.perf_counter() - start
+        if nodes != expected:
+            raise RuntimeError(f"perft {name} depth {perft_depth}: {nodes} nodes, expected {expected}")
+        results[f"perft_{name}_nps"] = nodes / elapsed
+
+    boards = [chess.Board(fen) for fen in killbill.BENCH_POSITIONS]
+    results["evaluate_board_per_s"] = rate(killbill.evaluate_board, boards)
+    # Move ordering as done at every interior node of the search, counted per position
+    results["order_moves_per_s"] = rate(lambda board: killbill.MoveOrdering().order_moves(board, 0), boards)
+
+    nodes, elapsed = killbill.bench(depth)
+    results["bench_depth"] = depth
+    results["bench_nodes"] = nodes
+    results["bench_nps"] = nodes / elapsed
+    return results
+
+
+def main():
+    '''
+    Usage: python benchmark.py [depth] [--json results.json] [--compare baseline.json]
+
+    Measures perft, evaluation, move ordering and search speed of killbill. --json saves the results
+    so that another commit can be compared against them with --compare, which prints the ratio of
+    every rate to the baseline and checks that the bench node signature is unchanged.
+    '''
+    args = sys.argv[1:]
+    json_path = args[args.index("--json") + 1] if "--json" in args else None
+    compare_path = args[args.index("--compare") + 1] if "--compare" in args else None
+    positional = [arg for index, arg in enumerate(args)
+                  if not arg.startswith("--") and (index == 0 or not args[index - 1].startswith("--"))]
+    depth = int(positional[0]) if positional else killbill.BENCH_DEPTH
+
+    results = run_benchmarks(depth)
+    baseline = {}
+    if compare_path:
+        with open(compare_path) as f:
+            baseline = json.load(f)
+    for name, value in results.items():
+        line = f"{name:32} {value:14.1f}" if isinstance(value, float) else f"{name:32} {value:14}"
+        if name in baseline and name.endswith(("_per_s", "_nps")):
+            line += f"   x{value / baseline[name]:.2f} vs baseline"
+        print(line)
+    if baseline.get("bench_depth") == depth and baseline.get("bench_nodes") != results["bench_nodes"]:
+        print(f"bench signature changed: {baseline['bench_nodes']} -> {results['bench_nodes']} nodes")
+
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,97 @@ import matplotlib.pyplot as plt
 import networkx as nx
 import random
 
+MASK64 = (1 << 64) - 1
+
+
+def _mix64(x):
+    """
+    SplitMix64 finalizer, used to derive leaf utilities from a seed and node id
+    without any shared random state.
+    """
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+class _ImplicitNodeView:
+    """
+    Read-only stand-in for G.nodes so that G.nodes[node]["utility"] works on an
+    ImplicitGameTree like it does on a networkx graph.
+    """
+
+    def __init__(self, tree):
+        self._tree = tree
+
+    def __getitem__(self, node):
+        return {"utility": self._tree.utility(node)}
+
+    def __len__(self):
+        return self._tree.number_of_nodes()
+
+    def __iter__(self):
+        return iter(range(self._tree.number_of_nodes()))
+
+    def __contains__(self, node):
+        return 0 <= node < self._tree.number_of_nodes()
+
+
+class ImplicitGameTree:
+    """
+    A balanced game tree that is never materialized. Nodes are integers numbered
+    like nx.balanced_tree: the root is 0 and child i of node n is n*b+1+i. Leaf
+    utilities are derived on demand from a hash of the seed and the node id, so
+    the same seed always gives the same game. Supports the parts of the networkx
+    DiGraph interface used by minimax and alphabeta (neighbors, successors,
+    out_degree and nodes[node]["utility"]).
+    """
+
+    def __init__(self, branching, height, seed=0, isZeroSum=True):
+        self.branching = branching
+        self.height = height
+        self.seed = seed
+        self.isZeroSum = isZeroSum
+        # Leaves are numbered from the first node of the last level onwards
+        if branching == 1:
+            self.firstLeaf = height
+        else:
+            self.firstLeaf = (branching ** height - 1) // (branching - 1)
+        self.nodes = _ImplicitNodeView(self)
+
+    def number_of_nodes(self):
+        return self.firstLeaf + self.branching ** self.height
+
+    def isLeaf(self, node):
+        return node >= self.firstLeaf
+
+    def successors(self, node):
+        if self.isLeaf(node):
+            return iter(())
+        first = node * self.branching + 1
+        return iter(range(first, first + self.branching))
+
+    neighbors = successors
+
+    def out_degree(self, node):
+        return 0 if self.isLeaf(node) else self.branching
+
+    def parent(self, node):
+        return (node - 1) // self.branching if node > 0 else None
+
+    def utility(self, node):
+        """
+        Returns the utility tuple of a leaf, or None for an interior node, in the
+        same form and range as createRandomGame.
+        """
+        if not self.isLeaf(node):
+            return None
+        h = _mix64(_mix64(self.seed) ^ node)
+        if self.isZeroSum:
+            payoff = h % 85 - 42
+            return (payoff, -payoff)
+        return (h % 43, (h >> 32) % 43)
+
 
 def createRandomGame(rounds, actions, seed=0, isZeroSum=True):
     """
@@ -16,7 +107,6 @@ def createRandomGame(rounds, actions, seed=0, isZeroSum=True):
     random.seed(seed)
     attrs = {}
     for node in G.nodes():
-        print(node)
         if len(list(G.neighbors(node))) == 0:
             if isZeroSum:
                 payoff = random.randint(-42, 42)
@@ -30,6 +120,43 @@ def createRandomGame(rounds, actions, seed=0, isZeroSum=True):
     return G
 
 
+def createImplicitRandomGame(rounds, actions, seed=0, isZeroSum=True):
+    """
+    Creates the same shape of game as createRandomGame without allocating it
+    @param rounds - number of rounds
+    @param actions - number of actions per round
+    @param seed - [optional][default = 0] for reproducible leaf utilities
+    @param isZeroSum - [optional][default = True] when False create general sum
+    @return random game as an ImplicitGameTree
+    """
+    return ImplicitGameTree(actions, rounds*2, seed, isZeroSum)
+
+
+def alphabetaUtility(G, node=0, alpha=float("-inf"), beta=float("inf"), maximizing=True, stats=None):
+    """
+    Alpha-beta value of a zero-sum game for player 0. Works on networkx games
+    and on ImplicitGameTree games alike.
+    @param stats - [optional] dict whose "leaves" entry counts leaves visited
+    @return utility for player 0
+    """
+    if G.out_degree(node) == 0:
+        if stats is not None:
+            stats["leaves"] = stats.get("leaves", 0) + 1
+        return G.nodes[node]["utility"][0]
+    best = float("-inf") if maximizing else float("inf")
+    for child in G.neighbors(node):
+        value = alphabetaUtility(G, child, alpha, beta, not maximizing, stats)
+        if maximizing:
+            best = max(best, value)
+            alpha = max(alpha, best)
+        else:
+            best = min(best, value)
+            beta = min(beta, best)
+        if beta <= alpha:
+            break
+    return best
+
+
 def exampleGameTree():
     """
     Create example game from Russell & Norvig
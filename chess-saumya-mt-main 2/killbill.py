@@ -1,9 +1,10 @@
 import chess
-import chess.pgn
-import networkx as nx
-import matplotlib.pyplot as plt
+import chess.polyglot
 import sys
 import random
+import time
+import multiprocessing
+from array import array
 
 # Evaluation Function
 
@@ -171,9 +172,324 @@ def alphabeta(graph, node, depth, alpha, beta, maximizing_player):
                 break
         return min_eval
 
+# Move Ordering
+
+# Piece values used to rank captures (Most Valuable Victim - Least Valuable Attacker)
+MVV_LVA_VALUES = {
+    chess.PAWN: 1,
+    chess.KNIGHT: 3,
+    chess.BISHOP: 3,
+    chess.ROOK: 5,
+    chess.QUEEN: 9,
+    chess.KING: 10
+}
+
+# Ordering bands: the hash move is tried first, then captures, then killers, then quiet moves by history
+HASH_MOVE_SCORE = 1_000_000
+CAPTURE_SCORE = 100_000
+KILLER_SCORES = (90_000, 80_000)
+
+# Score given to a checkmate, larger than any evaluate_board result
+MATE_SCORE = 1000
+
+# Transposition table entry flags
+EXACT, LOWERBOUND, UPPERBOUND = 0, 1, 2
+
+
+class MoveOrdering:
+    '''
+    Move-ordering tables shared by one search: a transposition table that supplies the hash move,
+    two killer moves per ply and a history table for quiet moves. Also counts the nodes visited so
+    the effect of the ordering on the branching factor can be measured.
+    '''
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.transposition = {}  # zobrist key -> (depth, score, flag, best move)
+        self.killers = {}  # ply -> [killer, killer]
+        self.history = {}  # (color, from square, to square) -> score
+        self.nodes = 0
+
+    def order_moves(self, board, ply, hash_move=None):
+        '''
+        Returns the legal moves of the board sorted best first. When ordering is disabled the moves
+        are shuffled, which reproduces the unordered baseline.
+        '''
+        moves = list(board.legal_moves)
+        if not self.enabled:
+            random.shuffle(moves)
+            return moves
+        killers = self.killers.get(ply, ())
+        moves.sort(key=lambda move: self.score_move(board, move, hash_move, killers), reverse=True)
+        return moves
+
+    def score_move(self, board, move, hash_move, killers):
+        '''Returns the ordering score of a single move.'''
+        if move == hash_move:
+            return HASH_MOVE_SCORE
+        if board.is_capture(move):
+            if board.is_en_passant(move):
+                victim = chess.PAWN
+            else:
+                victim = board.piece_type_at(move.to_square)
+            attacker = board.piece_type_at(move.from_square)
+            return CAPTURE_SCORE + 10 * MVV_LVA_VALUES[victim] - MVV_LVA_VALUES[attacker]
+        if move.promotion:
+            return CAPTURE_SCORE + 10 * MVV_LVA_VALUES[move.promotion]
+        for killer, score in zip(killers, KILLER_SCORES):
+            if move == killer:
+                return score
+        return self.history.get((board.turn, move.from_square, move.to_square), 0)
+
+    def record_cutoff(self, board, move, ply, depth):
+        '''Updates the killer and history tables after a quiet move caused a beta cutoff.'''
+        if board.is_capture(move) or move.promotion:
+            return
+        killers = self.killers.setdefault(ply, [None, None])
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        key = (board.turn, move.from_square, move.to_square)
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
+
+def evaluate_terminal(board: chess.Board, ply: int) -> float:
+    '''
+    Scores a finished game from White's point of view. Faster mates score higher.
+    '''
+    if board.is_checkmate():
+        return -(MATE_SCORE - ply) if board.turn == chess.WHITE else MATE_SCORE - ply
+    return 0
+
+
+def search(board, depth, alpha, beta, maximizing_player, ordering, ply=0):
+    '''
+    Alpha-beta search directly on a chess.Board, using the transposition table for the hash move
+    and the killer and history tables to order the remaining moves. Returns the evaluation of the
+    position from White's point of view.
+    '''
+    ordering.nodes += 1
+    if board.is_game_over():
+        return evaluate_terminal(board, ply)
+    if depth == 0:
+        return evaluate_board(board)
+
+    key = chess.polyglot.zobrist_hash(board)
+    entry = ordering.transposition.get(key)
+    hash_move = None
+    if entry is not None:
+        entry_depth, entry_score, entry_flag, hash_move = entry
+        if entry_depth >= depth:
+            if entry_flag == EXACT:
+                return entry_score
+            if entry_flag == LOWERBOUND and entry_score >= beta:
+                return entry_score
+            if entry_flag == UPPERBOUND and entry_score <= alpha:
+                return entry_score
+
+    alpha_start, beta_start = alpha, beta
+    best_move = None
+    if maximizing_player:
+        # Maximizing player's turn (White)
+        best_eval = float('-inf')
+        for move in ordering.order_moves(board, ply, hash_move):
+            board.push(move)
+            eval = search(board, depth - 1, alpha, beta, False, ordering, ply + 1)
+            board.pop()
+            if eval > best_eval:
+                best_eval, best_move = eval, move
+            alpha = max(alpha, eval)
+            if beta <= alpha:
+                ordering.record_cutoff(board, move, ply, depth)
+                break
+    else:
+        # Minimizing player's turn (Black)
+        best_eval = float('inf')
+        for move in ordering.order_moves(board, ply, hash_move):
+            board.push(move)
+            eval = search(board, depth - 1, alpha, beta, True, ordering, ply + 1)
+            board.pop()
+            if eval < best_eval:
+                best_eval, best_move = eval, move
+            beta = min(beta, eval)
+            if beta <= alpha:
+                ordering.record_cutoff(board, move, ply, depth)
+                break
+
+    # Store the result with a flag describing whether it is exact or only a bound
+    if best_eval <= alpha_start:
+        flag = UPPERBOUND
+    elif best_eval >= beta_start:
+        flag = LOWERBOUND
+    else:
+        flag = EXACT
+    ordering.transposition[key] = (depth, best_eval, flag, best_move)
+    return best_eval
+
+
+def search_best_move(board, depth, ordering=None):
+    '''
+    Finds the best move for the side to move with iterative deepening, so every iteration seeds the
+    hash moves of the next. Returns the best move, its evaluation and the MoveOrdering used.
+    '''
+    if ordering is None:
+        ordering = MoveOrdering()
+    maximizing_player = board.turn == chess.WHITE
+    best_move, best_eval = None, None
+    for current_depth in range(1, depth + 1):
+        best_eval = search(board, current_depth, float('-inf'), float('inf'), maximizing_player, ordering)
+        entry = ordering.transposition.get(chess.polyglot.zobrist_hash(board))
+        if entry is not None:
+            best_move = entry[3]
+    return best_move, best_eval, ordering
+
+
+def effective_branching_factor(nodes, depth):
+    '''Returns the branching factor b such that b ** depth equals the number of nodes searched.'''
+    return nodes ** (1 / depth) if depth > 0 else 0
+
+
+def compare_move_ordering(board, depth):
+    '''
+    Searches the board to a fixed depth with and without move ordering and prints the node counts
+    and effective branching factors of both runs. The ordered run includes the nodes of the
+    shallower iterative deepening iterations that fill in the hash moves.
+    '''
+    for enabled in (False, True):
+        ordering = MoveOrdering(enabled=enabled)
+        if enabled:
+            search_best_move(board, depth, ordering)
+        else:
+            maximizing_player = board.turn == chess.WHITE
+            search(board, depth, float('-inf'), float('inf'), maximizing_player, ordering)
+        label = "ordered" if enabled else "unordered"
+        print(f"{label}: depth {depth}, nodes {ordering.nodes}, "
+              f"effective branching factor {effective_branching_factor(ordering.nodes, depth):.2f}")
+
+# Benchmark
+
+# Fixed positions searched by 'bench': the start position, tactical middlegames and endgames
+BENCH_POSITIONS = [
+    chess.STARTING_FEN,
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+    "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1",
+]
+
+# Default depth of 'bench'
+BENCH_DEPTH = 3
+
+
+def bench(depth=BENCH_DEPTH):
+    '''
+    Searches every bench position to a fixed depth with fresh move-ordering tables and returns the
+    total nodes and the elapsed seconds. The search is deterministic, so the node count is a
+    signature that only changes when the search or the evaluation changes.
+    '''
+    nodes = 0
+    start = time.perf_counter()
+    for fen in BENCH_POSITIONS:
+        _, _, ordering = search_best_move(chess.Board(fen), depth)
+        nodes += ordering.nodes
+    return nodes, time.perf_counter() - start
+
+
+def print_bench(depth=BENCH_DEPTH):
+    '''Runs the bench and prints the total nodes, time and nodes per second.'''
+    nodes, elapsed = bench(depth)
+    print(f"Positions       : {len(BENCH_POSITIONS)} at depth {depth}")
+    print(f"Total time (ms) : {elapsed * 1000:.0f}")
+    print(f"Nodes searched  : {nodes}")
+    print(f"Nodes/second    : {nodes / elapsed:.0f}")
+
+# Parallel Search (Root Splitting)
+
+def search_root_move(task):
+    '''
+    Worker entry point for parallel search. Plays one root move and searches the resulting position
+    inside the (alpha, beta) window with iterative deepening and its own move-ordering tables, so
+    the result depends only on the task. Returns the move, its evaluation from White's point of view
+    and the number of nodes searched.
+    '''
+    fen, move_uci, depth, alpha, beta = task
+    board = chess.Board(fen)
+    board.push(chess.Move.from_uci(move_uci))
+    ordering = MoveOrdering()
+    maximizing_player = board.turn == chess.WHITE
+    eval = evaluate_terminal(board, 1) if board.is_game_over() else evaluate_board(board)
+    for current_depth in range(1, depth):
+        eval = search(board, current_depth, alpha, beta, maximizing_player, ordering, 1)
+    return move_uci, eval, ordering.nodes
+
+
+def parallel_search_best_move(board, depth, pool=None):
+    '''
+    Splits the root moves of the board across a multiprocessing pool and returns the best move, its
+    evaluation and the number of nodes searched. The first (best ordered) move is searched on its
+    own to get a bound, and the remaining moves are searched in parallel against that bound.
+    Without a pool it falls back to the single-threaded search_best_move. Ties are broken by the
+    root move order, so the result is deterministic.
+    '''
+    if pool is None:
+        move, eval, ordering = search_best_move(board, depth)
+        return move, eval, ordering.nodes
+
+    root_moves = MoveOrdering().order_moves(board, 0)
+    if not root_moves:
+        return None, evaluate_terminal(board, 0), 1
+    fen = board.fen()
+    best_uci, best_eval, nodes = search_root_move((fen, root_moves[0].uci(), depth, float('-inf'), float('inf')))
+    nodes += 1
+
+    # Moves that cannot beat the first move fail low against its score and are cut off early
+    maximizing_player = board.turn == chess.WHITE
+    if maximizing_player:
+        window = (best_eval, float('inf'))
+    else:
+        window = (float('-inf'), best_eval)
+    tasks = [(fen, move.uci(), depth) + window for move in root_moves[1:]]
+    for move_uci, eval, move_nodes in pool.map(search_root_move, tasks, chunksize=1):
+        nodes += move_nodes
+        if (maximizing_player and eval > best_eval) or (not maximizing_player and eval < best_eval):
+            best_uci, best_eval = move_uci, eval
+    return chess.Move.from_uci(best_uci), best_eval, nodes
+
+
+def measure_parallel_speedup(board, depth, max_threads):
+    '''
+    Searches the board to a fixed depth with 1, 2, 4, ... up to max_threads processes and prints the
+    time, node count and speedup over the single-threaded search for each.
+    '''
+    thread_counts = [1]
+    while thread_counts[-1] * 2 <= max_threads:
+        thread_counts.append(thread_counts[-1] * 2)
+    if thread_counts[-1] != max_threads:
+        thread_counts.append(max_threads)
+
+    baseline = None
+    for threads in thread_counts:
+        pool = multiprocessing.Pool(threads) if threads > 1 else None
+        try:
+            start = time.perf_counter()
+            move, eval, nodes = parallel_search_best_move(board, depth, pool)
+            elapsed = time.perf_counter() - start
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        baseline = baseline or elapsed
+        print(f"threads {threads}: depth {depth}, best move {move.uci()}, eval {eval:.2f}, "
+              f"nodes {nodes}, time {elapsed:.2f}s, speedup {baseline / elapsed:.2f}x")
+
 # Generate Game Tree from Opening Sequence
 
 def generate_game_tree(opening_moves, depth=4):  # Updated depth to 4 for clarity
+    import networkx as nx
+
     board = chess.Board()
     graph = nx.DiGraph()
     # Create the root node with the initial board state
@@ -207,6 +523,8 @@ def generate_game_tree(opening_moves, depth=4):  # Updated depth to 4 for clarit
 # Convert Graph to Tree-like Structure
 
 def convert_to_tree(graph):
+    import networkx as nx
+
     tree = nx.DiGraph()
     root_node = 0
     tree.add_node(root_node, **graph.nodes[root_node])
@@ -221,9 +539,180 @@ def convert_to_tree(graph):
     add_to_tree(root_node, root_node)
     return tree
 
+# Compact Game Tree for Analysis
+
+class CompactGameTree:
+    '''
+    Array-backed game tree for analysis mode. Node i is described by entry i of parallel arrays
+    (parent, first child, next sibling, move, evaluation, minimax and alpha-beta values and a pruned
+    flag) instead of a networkx node with a FEN string and an attribute dict, so deep trees stay
+    small. Minimax and alpha-beta write into their own arrays and pruning is only flagged, so both
+    can be re-run and compared on the same tree.
+    '''
+
+    def __init__(self, root_fen):
+        self.root_fen = root_fen
+        self.parent = array('i')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+        self.move = array('H')  # from square | to square << 6 | promotion << 12
+        self.evaluation = array('d')
+        self.minimax = array('d')
+        self.alphabeta = array('d')
+        self.pruned = array('b')
+
+    def __len__(self):
+        return len(self.parent)
+
+    def add_node(self, parent, move, evaluation):
+        '''Appends a node as the last child of parent (-1 for the root) and returns its index.'''
+        node = len(self.parent)
+        self.parent.append(parent)
+        self.first_child.append(-1)
+        self.next_sibling.append(-1)
+        self.move.append(encode_move(move) if move else 0)
+        self.evaluation.append(evaluation)
+        self.minimax.append(float('nan'))
+        self.alphabeta.append(float('nan'))
+        self.pruned.append(0)
+        if parent >= 0:
+            if self.first_child[parent] < 0:
+                self.first_child[parent] = node
+            else:
+                sibling = self.first_child[parent]
+                while self.next_sibling[sibling] >= 0:
+                    sibling = self.next_sibling[sibling]
+                self.next_sibling[sibling] = node
+        return node
+
+    def children(self, node):
+        '''Yields the children of a node in insertion order.'''
+        child = self.first_child[node]
+        while child >= 0:
+            yield child
+            child = self.next_sibling[child]
+
+    def mark_pruned(self, node):
+        '''Flags the node and its whole subtree as pruned.'''
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self.pruned[current] = 1
+            stack.extend(self.children(current))
+
+    def move_uci(self, node):
+        '''Returns the move leading to a node in UCI notation.'''
+        return decode_move(self.move[node]).uci()
+
+    def reset_values(self):
+        '''Clears the minimax and alpha-beta results so the searches can be run again.'''
+        nan = float('nan')
+        for node in range(len(self)):
+            self.minimax[node] = nan
+            self.alphabeta[node] = nan
+            self.pruned[node] = 0
+
+
+def encode_move(move):
+    '''Packs a chess.Move into 16 bits.'''
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def decode_move(code):
+    '''Unpacks a move packed by encode_move.'''
+    return chess.Move(code & 63, (code >> 6) & 63, (code >> 12) or None)
+
+
+def generate_compact_tree(opening_moves, depth=4, width=3):
+    '''
+    Builds a CompactGameTree from the position after the opening moves, expanding up to width
+    randomly chosen moves per node down to the given depth.
+    '''
+    board = chess.Board()
+    for move in opening_moves:
+        board.push(chess.Move.from_uci(move))
+    tree = CompactGameTree(board.fen())
+    tree.add_node(-1, None, evaluate_board(board))
+
+    def add_children(node, current_depth):
+        if current_depth >= depth:
+            return
+        legal_moves = list(board.legal_moves)
+        random.shuffle(legal_moves)
+        for move in legal_moves[:width]:
+            board.push(move)
+            child = tree.add_node(node, move, evaluate_board(board))
+            add_children(child, current_depth + 1)
+            board.pop()
+
+    add_children(0, 0)
+    return tree
+
+
+def compact_minimax(tree, node, depth, maximizing_player):
+    '''Minimax over a CompactGameTree, storing each child's value in tree.minimax.'''
+    if depth == 0 or tree.first_child[node] < 0:
+        return tree.evaluation[node]
+
+    best_eval = float('-inf') if maximizing_player else float('inf')
+    for child in tree.children(node):
+        eval = compact_minimax(tree, child, depth - 1, not maximizing_player)
+        tree.minimax[child] = eval
+        best_eval = max(best_eval, eval) if maximizing_player else min(best_eval, eval)
+    return best_eval
+
+
+def compact_alphabeta(tree, node, depth, alpha, beta, maximizing_player):
+    '''
+    Alpha-beta over a CompactGameTree, storing each visited child's value in tree.alphabeta. Children
+    skipped by a cutoff are flagged in tree.pruned, together with their subtrees, instead of being
+    removed.
+    '''
+    if depth == 0 or tree.first_child[node] < 0:
+        return tree.evaluation[node]
+
+    best_eval = float('-inf') if maximizing_player else float('inf')
+    cutoff = False
+    for child in tree.children(node):
+        if cutoff:
+            tree.mark_pruned(child)
+            continue
+        eval = compact_alphabeta(tree, child, depth - 1, alpha, beta, not maximizing_player)
+        tree.alphabeta[child] = eval
+        if maximizing_player:
+            best_eval = max(best_eval, eval)
+            alpha = max(alpha, eval)
+        else:
+            best_eval = min(best_eval, eval)
+            beta = min(beta, eval)
+        cutoff = beta <= alpha
+    return best_eval
+
+
+def compact_tree_to_networkx(tree):
+    '''
+    Exports a CompactGameTree to a networkx DiGraph for drawing. Nodes carry evaluation, minimax and
+    alphabeta attributes and edges carry the move and whether it was pruned.
+    '''
+    import networkx as nx
+
+    graph = nx.DiGraph()
+    for node in range(len(tree)):
+        attributes = {'evaluation': tree.evaluation[node]}
+        if tree.minimax[node] == tree.minimax[node]:  # Skip NaN (not computed)
+            attributes['minimax'] = tree.minimax[node]
+        if tree.alphabeta[node] == tree.alphabeta[node]:
+            attributes['alphabeta'] = tree.alphabeta[node]
+        graph.add_node(node, **attributes)
+        if tree.parent[node] >= 0:
+            graph.add_edge(tree.parent[node], node, move=tree.move_uci(node), pruned=bool(tree.pruned[node]))
+    return graph
+
 # Example Game Tree Printing
 
 def print_example_game_tree():
+    import networkx as nx
+
     # Generate a random game tree for demonstration purposes
     graph = generate_game_tree(opening_moves=["d2d4", "d7d5", "c2c4", "e7e5"], depth=3)
     tree_graph = convert_to_tree(graph)
@@ -234,6 +723,10 @@ def print_example_game_tree():
 # Draw the Game Tree
 
 def draw_game_tree(graph, title="Game Tree with Minimax and Alpha-Beta Pruning"):
+    # Drawing dependencies are only loaded in analysis mode, to keep UCI startup fast
+    import networkx as nx
+    import matplotlib.pyplot as plt
+
     # Generate positions for the nodes
     pos = nx.spring_layout(graph)
     # Labels for the edges representing the moves
@@ -243,30 +736,185 @@ def draw_game_tree(graph, title="Game Tree with Minimax and Alpha-Beta Pruning")
     # Labels for nodes showing alpha-beta values
     alpha_beta_labels = {node: f"AlphaBeta: {graph.nodes[node].get('alphabeta', '')}" for node in graph.nodes}
 
+    # Pruned edges are drawn dashed and grey
+    edge_colors = ['grey' if graph.edges[edge].get('pruned') else 'black' for edge in graph.edges]
+    edge_styles = ['dashed' if graph.edges[edge].get('pruned') else 'solid' for edge in graph.edges]
+
     # Draw the graph with node and edge labels
     plt.figure(figsize=(12, 8))
-    nx.draw(graph, pos, with_labels=True, node_color='lightblue', node_size=500, font_size=8)
+    nx.draw(graph, pos, with_labels=True, node_color='lightblue', node_size=500, font_size=8,
+            edge_color=edge_colors, style=edge_styles)
     nx.draw_networkx_edge_labels(graph, pos, edge_labels=labels, font_color='red')
     nx.draw_networkx_labels(graph, pos, labels=minimax_labels, font_color='green', verticalalignment='bottom')
     nx.draw_networkx_labels(graph, pos, labels=alpha_beta_labels, font_color='purple', verticalalignment='top')
     plt.title(title)
     plt.show()
 
-# Main function to run with command line argument 'draw'
+# Opening Book
+
+def open_book(book_path):
+    '''
+    Opens a Polyglot opening book. The file is memory mapped and probed with a binary search on the
+    zobrist key of the position, so lookups do not read the whole book. Returns None if the book
+    cannot be opened.
+    '''
+    try:
+        return chess.polyglot.open_reader(book_path)
+    except OSError:
+        return None
+
+
+def book_move(board, book, mode="weighted"):
+    '''
+    Returns a book move for the board, either the highest weighted entry ('best') or a random entry
+    chosen in proportion to the weights ('weighted'). Returns None when the position is out of book.
+    '''
+    if book is None:
+        return None
+    try:
+        if mode == "best":
+            return book.find(board).move
+        return book.weighted_choice(board).move
+    except IndexError:
+        return None
+
+# UCI Engine
+
+board = chess.Board()
+
+# Engine options that can be changed with 'setoption'
+options = {
+    "Threads": 1,
+    "Depth": 2,
+    "BookFile": "",
+    "BookMode": "weighted"
+}
+
+# Opened Polyglot book, or None when no book is configured
+opening_book = None
+
+# Process pool used for parallel search when Threads is greater than 1
+search_pool = None
+
+
+def set_threads(threads):
+    '''Resizes the search pool. A single thread uses the deterministic single-process search.'''
+    global search_pool
+    threads = max(1, min(threads, multiprocessing.cpu_count()))
+    if search_pool is not None:
+        search_pool.terminate()
+        search_pool = None
+    if threads > 1:
+        search_pool = multiprocessing.Pool(threads)
+    options["Threads"] = threads
+
+
+def set_book(book_path):
+    '''Replaces the opening book. An empty path disables book moves.'''
+    global opening_book
+    if opening_book is not None:
+        opening_book.close()
+    opening_book = open_book(book_path) if book_path and book_path != "<empty>" else None
+    options["BookFile"] = book_path
+
+
+def uci(msg: str):
+    '''Processes UCI commands with the internal board state'''
+    if msg == "uci":
+        print("id name KillBill")
+        print("id author saumya-mt")
+        print(f"option name Threads type spin default 1 min 1 max {multiprocessing.cpu_count()}")
+        print("option name Depth type spin default 2 min 1 max 8")
+        print("option name BookFile type string default <empty>")
+        print("option name BookMode type combo default weighted var weighted var best")
+        print("uciok")
+    elif msg == "isready":
+        print("readyok")
+    elif msg.startswith("setoption name "):
+        name, _, value = msg.removeprefix("setoption name ").partition(" value ")
+        if name == "Threads":
+            set_threads(int(value))
+        elif name == "Depth":
+            options["Depth"] = int(value)
+        elif name == "BookFile":
+            set_book(value)
+        elif name == "BookMode":
+            options["BookMode"] = value
+    elif msg == "ucinewgame":
+        board.reset()
+    elif msg.startswith("position startpos"):
+        board.reset()
+        for move in msg.split()[3:]:
+            board.push(chess.Move.from_uci(move))
+    elif msg.startswith("position fen"):
+        fen, _, moves = msg.removeprefix("position fen ").partition(" moves ")
+        board.set_fen(fen)
+        for move in moves.split():
+            board.push(chess.Move.from_uci(move))
+    elif msg.startswith("go"):
+        # Answer instantly while the position is still in the opening book
+        move = book_move(board, opening_book, options["BookMode"])
+        if move:
+            print(f"bestmove {move.uci()}")
+            return
+        args = msg.split()
+        depth = int(args[args.index("depth") + 1]) if "depth" in args else options["Depth"]
+        move, eval, nodes = parallel_search_best_move(board, depth, search_pool)
+        print(f"bestmove {move.uci()}" if move else "bestmove (none)")
+    elif msg.startswith("bench"):
+        args = msg.split()
+        print_bench(int(args[1]) if len(args) > 1 else BENCH_DEPTH)
+    elif msg == "quit":
+        if search_pool is not None:
+            search_pool.terminate()
+        sys.exit(0)
+    else:
+        print(f"Unknown command: {msg}", file=sys.stderr)
+
+
+def uci_loop():
+    '''Main loop to process UCI commands'''
+    while True:
+        uci(input())
+        sys.stdout.flush()
+
+# Main function: UCI engine by default, 'draw', 'tree', 'ordering', 'threads' and 'bench' for analysis
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     # Define the opening moves (e.g., Queen's Gambit Declined as default)
     opening_moves = ["d2d4", "d7d5", "c2c4", "e7e6"]
-    # Generate the game tree from the given opening moves
-    graph = generate_game_tree(opening_moves)
-
+    command = sys.argv[1] if len(sys.argv) > 1 else "uci"
+
+    # If 'ordering' argument is provided, compare node counts with and without move ordering
+    if command == "ordering":
+        board.set_fen(chess.STARTING_FEN)
+        for move in opening_moves:
+            board.push(chess.Move.from_uci(move))
+        compare_move_ordering(board, int(sys.argv[2]) if len(sys.argv) > 2 else 3)
+    # If 'threads' argument is provided, measure the speedup of parallel search at a fixed depth
+    elif command == "threads":
+        for move in opening_moves:
+            board.push(chess.Move.from_uci(move))
+        depth = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+        max_threads = int(sys.argv[3]) if len(sys.argv) > 3 else multiprocessing.cpu_count()
+        measure_parallel_speedup(board, depth, max_threads)
     # If 'draw' argument is provided, draw the game tree with minimax and alpha-beta pruning values
-    if len(sys.argv) > 1 and sys.argv[1] == "draw":
-        minimax(graph, 0, 4, True)  # Updated depth to 4
-        alphabeta(graph, 0, 4, float('-inf'), float('inf'), True)  # Updated depth to 4
+    elif command == "draw":
+        # Generate the game tree from the given opening moves (optionally deeper than 4 plies)
+        depth = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+        tree = generate_compact_tree(opening_moves, depth)
+        compact_minimax(tree, 0, depth, True)
+        compact_alphabeta(tree, 0, depth, float('-inf'), float('inf'), True)
         # Extract the best move from the root node after running Minimax
-        best_move = max(graph.successors(0), key=lambda n: graph.nodes[n].get('minimax', float('-inf')))
-        best_move_notation = graph.edges[(0, best_move)]['move']
+        best_move = max(tree.children(0), key=lambda n: tree.minimax[n])
+        best_move_notation = tree.move_uci(best_move)
+        graph = compact_tree_to_networkx(tree)
         draw_game_tree(graph, title=f"Game Tree with Minimax and Alpha-Beta Pruning (Best Move: {best_move_notation})")
-    else:
+    # If 'bench' argument is provided, search the bench positions and report nodes and speed
+    elif command == "bench":
+        print_bench(int(sys.argv[2]) if len(sys.argv) > 2 else BENCH_DEPTH)
+    elif command == "tree":
         # Print the example game tree structure
         print_example_game_tree()
+    else:
+        uci_loop()
@@ -0,0 +1,34 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Slim build of the killbill UCI engine: pyinstaller killbill.spec
+# UCI play only needs python-chess, so the drawing and numeric stacks are left out of the bundle.
+# The 'draw', 'tree' and 'ordering' analysis modes need a regular Python install.
+
+a = Analysis(
+    ['killbill.py'],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=['networkx', 'matplotlib', 'numpy', 'scipy', 'pandas', 'PIL', 'tkinter', 'IPython'],
+    noarchive=False,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.datas,
+    [],
+    name='killbill',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    runtime_tmpdir=None,
+    console=True,
+)
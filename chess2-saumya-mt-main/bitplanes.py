@@ -0,0 +1,52 @@
+import chess
+
+# One plane of 64 squares for each (color, piece type) pair: white pawn .. white king, black pawn .. black king
+NUM_PLANES = 12
+
+# 12 x 64 piece bits plus one feature for whose turn it is (1 for black's turn)
+NUM_BITPLANE_FEATURES = NUM_PLANES * 64 + 1
+
+# Index of the side-to-move feature
+TURN_FEATURE = NUM_PLANES * 64
+
+def board_to_bitplane_indices(board):
+    """
+    Returns the indices of the set features of the one-hot bitplane encoding, read straight from
+    the board's piece bitboards. A position has at most 33 set features out of 769.
+    """
+    indices = []
+    for plane_offset, color in ((0, chess.WHITE), (6 * 64, chess.BLACK)):
+        for piece_type in chess.PIECE_TYPES:
+            base = plane_offset + (piece_type - 1) * 64
+            indices.extend(base + square for square in chess.scan_forward(board.pieces_mask(piece_type, color)))
+    if board.turn == chess.BLACK:
+        indices.append(TURN_FEATURE)
+    return indices
+
+def boards_to_csr(boards):
+    """
+    Encodes boards as a sparse CSR matrix with one row of NUM_BITPLANE_FEATURES binary features
+    per board.
+    """
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    indptr = [0]
+    indices = []
+    for board in boards:
+        indices.extend(board_to_bitplane_indices(board))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float32)
+    return csr_matrix((data, np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+                      shape=(len(indptr) - 1, NUM_BITPLANE_FEATURES))
+
+def fens_to_csr(fens):
+    """Encodes a list of FEN strings as a sparse CSR bitplane matrix."""
+    return boards_to_csr(chess.Board(fen) for fen in fens)
+
+def linear_bitplane_eval(indices, coef, intercept):
+    """
+    Evaluates a linear model on a bitplane-encoded position. Every feature is 0 or 1, so the dot
+    product is the sum of the coefficients of the set features.
+    """
+    return intercept + sum(coef[index] for index in indices)
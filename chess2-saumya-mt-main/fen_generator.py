@@ -1,37 +1,23 @@
+import argparse
 import csv
+import json
+import multiprocessing
+import os
+import queue
+import sqlite3
 import chess
 import chess.engine
+import chess.polyglot
 import random
 
-def generate_game_final_position(engine, writer, start_itr, game_num, max_moves=5):
-    board = chess.Board()
-    itr = start_itr
-    move_count = 0
-
-    for move_num in range(1, max_moves + 1):
-        legal_moves = list(board.legal_moves)
-        if not legal_moves:
-            reason = "No legal moves (Checkmate or Stalemate)"
-            print(f"Game {game_num} completed at move {move_num} due to {reason}.")
-            break  # Exit the move loop
-
-        move = random.choice(legal_moves)
-        board.push(move)
-        move_count += 1
-
-        if board.is_game_over():
-            reason = board.result(claim_draw=True) if board.is_stalemate() or board.is_insufficient_material() else "Checkmate"
-            print(f"Game {game_num} completed at move {move_num}: {reason}.")
-            break
+# Columns of the generated dataset
+FIELDNAMES = ['itr', 'fen', 'eval']
 
-    # Evaluate the final position
-    evaluation = evaluate_position(board, engine)
-    if evaluation is not None:
-        writer.writerow({'itr': itr, 'fen': board.fen(), 'eval': evaluation})
-        itr += 1
-
-    return itr, move_count
+# Rows written between checkpoints
+CHECKPOINT_EVERY = 50
 
+# SQLite file caching engine evaluations across runs, keyed by engine name, zobrist hash and depth
+CACHE_FILE = 'evaluation_cache.sqlite'
 
 def evaluate_position(board, engine, depth=15):
     """
@@ -56,27 +42,216 @@ def evaluate_position(board, engine, depth=15):
         print(f"Error evaluating position: {e}")
     return None
 
-def main():
-    engine_path = "/opt/homebrew/bin/stockfish"  # Change this path to your Stockfish executable
-    engine = chess.engine.SimpleEngine.popen_uci(engine_path)
+def play_random_game(max_moves=5):
+    """
+    Plays random legal moves from the starting position until max_moves moves have been made or
+    the game is over, and returns the final board.
+    """
+    board = chess.Board()
+    for _ in range(max_moves):
+        legal_moves = list(board.legal_moves)
+        if not legal_moves or board.is_game_over():
+            break
+        board.push(random.choice(legal_moves))
+    return board
+
 
+def position_key(board):
+    """
+    Returns the zobrist hash of the position as a signed 64-bit integer, so it fits an SQLite INTEGER.
+    """
+    key = chess.polyglot.zobrist_hash(board)
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+def open_cache(cache_path):
+    """
+    Opens the evaluation cache, creating it if needed. WAL mode lets the workers read while the
+    main process writes, and makes committing every new evaluation cheap. A cache written before
+    evaluations were keyed by engine is discarded, since its entries cannot be attributed.
+    """
+    connection = sqlite3.connect(cache_path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(evaluations)")]
+    if columns and "engine" not in columns:
+        connection.execute("DROP TABLE evaluations")
+    connection.execute("CREATE TABLE IF NOT EXISTS evaluations (engine TEXT, zobrist INTEGER, depth INTEGER, "
+                       "eval INTEGER, PRIMARY KEY (engine, zobrist, depth))")
+    connection.commit()
+    return connection
+
+
+def cached_evaluation(cache, engine_name, key, depth):
+    """
+    Returns the evaluation of the position by the named engine at the given depth, or None.
+    """
+    row = cache.execute("SELECT eval FROM evaluations WHERE engine = ? AND zobrist = ? AND depth = ?",
+                        (engine_name, key, depth)).fetchone()
+    return row[0] if row else None
+
+
+def engine_worker(engine_path, depth, max_moves, jobs, results, cache_path=None):
+    """
+    Worker process: owns one engine instance, takes game numbers from the jobs queue until it
+    reads None, and posts (game number, FEN, zobrist key, evaluation, cache hit, engine name) for
+    each game to the results queue. Positions this engine already evaluated at this depth are
+    taken from the evaluation cache. The evaluation is None when the engine gave no score.
+    """
+    random.seed()  # Forked workers would otherwise share the parent's random state
+    cache = sqlite3.connect(f"file:{cache_path}?mode=ro", uri=True) if cache_path else None
+    engine = chess.engine.SimpleEngine.popen_uci(engine_path)
+    # The name reported by the engine (e.g. 'Stockfish 17') keeps different engines' evaluations apart
+    engine_name = engine.id.get("name", engine_path)
     try:
-        with open('chess_evaluations.csv', 'w', newline='') as csvfile:
-            fieldnames = ['itr', 'fen', 'eval']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-
-            total_iterations = 0
-            num_games = 1000  # Number of separate games to generate
-            max_moves_per_game = 5  # Define maximum moves per game
-
-            for game_num in range(1, num_games + 1):
-                itr, moves_made = generate_game_final_position(
-                    engine, writer, total_iterations, game_num, max_moves=max_moves_per_game
-                )
-                total_iterations = itr
+        for game_num in iter(jobs.get, None):
+            board = play_random_game(max_moves)
+            key = position_key(board)
+            evaluation = cached_evaluation(cache, engine_name, key, depth) if cache else None
+            if evaluation is not None:
+                results.put((game_num, board.fen(), key, evaluation, True, engine_name))
+            else:
+                results.put((game_num, board.fen(), key, evaluate_position(board, engine, depth), False, engine_name))
     finally:
         engine.quit()
+        if cache:
+            cache.close()
+
+
+def load_checkpoint(checkpoint_path):
+    """
+    Returns the saved progress of an interrupted run: the completed game numbers, the number of
+    rows written and the CSV byte offset just after the last checkpointed row.
+    """
+    if not os.path.exists(checkpoint_path):
+        return set(), 0, None
+    with open(checkpoint_path) as f:
+        checkpoint = json.load(f)
+    return set(checkpoint['completed']), checkpoint['rows'], checkpoint['offset']
+
+
+def save_checkpoint(checkpoint_path, completed, rows, offset):
+    """
+    Atomically records which games are done and how much of the CSV they account for.
+    """
+    with open(checkpoint_path + '.tmp', 'w') as f:
+        json.dump({'completed': sorted(completed), 'rows': rows, 'offset': offset}, f)
+    os.replace(checkpoint_path + '.tmp', checkpoint_path)
+
+
+def written_positions(output, offset):
+    """
+    Returns the zobrist keys of the positions in the first `offset` bytes of the CSV.
+    """
+    with open(output, newline='') as csvfile:
+        lines = csvfile.read(offset).splitlines()
+    return {position_key(chess.Board(row['fen'])) for row in csv.DictReader(lines)}
+
+
+def generate_dataset(engine_path, output='chess_evaluations.csv', num_games=1000, workers=None,
+                     depth=15, max_moves=5, cache_path=CACHE_FILE):
+    """
+    Generates num_games random games and evaluates their final positions with a pool of worker
+    processes, each running its own engine. Workers pull game numbers from a job queue and the
+    main process is the only writer of the CSV.
+
+    Evaluations are stored in an SQLite cache keyed by engine name, zobrist hash and depth (pass
+    cache_path=None to disable it), so repeated positions are analysed once across runs. New
+    evaluations are committed straight away, so repeats within a run are cache hits too. Each position is written
+    to the CSV only once; games ending in a position already in the dataset add no row.
+
+    Progress is checkpointed to '<output>.checkpoint' every CHECKPOINT_EVERY rows. Running again
+    after a crash truncates the CSV to the last checkpoint and only plays the missing games; the
+    checkpoint is removed once every game is done.
+    """
+    workers = workers or os.cpu_count()
+    checkpoint_path = output + '.checkpoint'
+    completed, rows, offset = load_checkpoint(checkpoint_path)
+    if offset is None:
+        with open(output, 'w', newline='') as csvfile:
+            csv.DictWriter(csvfile, fieldnames=FIELDNAMES).writeheader()
+            offset = csvfile.tell()
+        save_checkpoint(checkpoint_path, completed, rows, offset)
+        written = set()
+    else:
+        print(f"Resuming: {len(completed)} of {num_games} games already done")
+        written = written_positions(output, offset)
+    cache = open_cache(cache_path) if cache_path else None
+    hits = misses = duplicates = 0
+
+    pending = [game_num for game_num in range(1, num_games + 1) if game_num not in completed]
+    jobs = multiprocessing.Queue()
+    results = multiprocessing.Queue()
+    for game_num in pending:
+        jobs.put(game_num)
+    processes = [multiprocessing.Process(target=engine_worker, args=(engine_path, depth, max_moves, jobs, results, cache_path))
+                 for _ in range(min(workers, len(pending)))]
+    for process in processes:
+        jobs.put(None)
+        process.start()
+
+    try:
+        with open(output, 'r+', newline='') as csvfile:
+            # Rows after the last checkpoint belong to games that will be played again
+            csvfile.seek(offset)
+            csvfile.truncate()
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
+            remaining = len(pending)
+            while remaining:
+                try:
+                    game_num, fen, key, evaluation, cached, engine_name = results.get(timeout=1)
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes):
+                        raise RuntimeError("All engine workers exited before the dataset was complete")
+                    continue
+                remaining -= 1
+                completed.add(game_num)
+                if cached:
+                    hits += 1
+                else:
+                    misses += 1
+                    if cache and evaluation is not None:
+                        cache.execute("INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?)",
+                                      (engine_name, key, depth, evaluation))
+                        cache.commit()
+                if key in written:
+                    duplicates += 1
+                elif evaluation is not None:
+                    writer.writerow({'itr': rows, 'fen': fen, 'eval': evaluation})
+                    written.add(key)
+                    rows += 1
+                if remaining == 0 or len(completed) % CHECKPOINT_EVERY == 0:
+                    csvfile.flush()
+                    os.fsync(csvfile.fileno())
+                    save_checkpoint(checkpoint_path, completed, rows, csvfile.tell())
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        if cache:
+            cache.close()
+    os.remove(checkpoint_path)
+    print(f"Wrote {rows} positions from {num_games} games to {output}")
+    if pending and cache_path:
+        print(f"Evaluation cache: {hits} hits, {misses} misses ({hits / len(pending):.1%} hit rate)")
+    print(f"{duplicates} duplicate positions skipped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a dataset of engine-evaluated random positions.")
+    # Change this path to your Stockfish executable, or pass --engine
+    parser.add_argument('--engine', default="/opt/homebrew/bin/stockfish", help="UCI engine used for evaluation")
+    parser.add_argument('--output', default='chess_evaluations.csv')
+    parser.add_argument('--games', type=int, default=1000, help="number of separate games to generate")
+    parser.add_argument('--workers', type=int, default=None, help="engine processes (default: one per core)")
+    parser.add_argument('--depth', type=int, default=15, help="engine search depth")
+    parser.add_argument('--max-moves', type=int, default=5, help="maximum moves per game")
+    parser.add_argument('--cache', default=CACHE_FILE, help="SQLite evaluation cache shared across runs")
+    parser.add_argument('--no-cache', action='store_true', help="analyse every position with the engine")
+    args = parser.parse_args()
+    generate_dataset(args.engine, args.output, args.games, args.workers, args.depth, args.max_moves,
+                     None if args.no_cache else args.cache)
 
 
 if __name__ == "__main__":
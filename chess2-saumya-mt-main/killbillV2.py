@@ -1,17 +1,101 @@
 #!/usr/bin/env python
 import chess
+import chess.polyglot
+from bitplanes import board_to_bitplane_indices, linear_bitplane_eval
 import sys
 import pickle
+import threading
+import time
+
+# Linear model exported by learner.export_model
+class LinearModel:
+    """
+    Linear regression model (Linear, Ridge, Lasso) stored as raw coefficients. Evaluates a batch of
+    feature rows with a single matrix product.
+    """
+
+    def __init__(self, coef, intercept):
+        self.coef = coef
+        self.intercept = intercept
+
+    def predict(self, features):
+        return features @ self.coef + self.intercept
+
+# Linear model on the sparse bitplane encoding, exported by learner.export_model
+class BitplaneLinearModel:
+    """
+    Linear model trained on the 12x64 bitplane encoding. Every feature is 0 or 1, so a position is
+    scored by summing the coefficients of its ~33 set features instead of a full dot product.
+    predict takes a list of index lists from board_to_bitplane_indices.
+    """
+
+    encoding = "bitplanes"
+
+    def __init__(self, coef, intercept):
+        self.coef = coef.tolist()
+        self.intercept = intercept
+
+    def predict(self, rows):
+        return [linear_bitplane_eval(indices, self.coef, self.intercept) for indices in rows]
+
+# Tree model exported by learner.export_model
+class TreeEnsembleModel:
+    """
+    Decision tree or random forest stored as flattened node arrays. Every row walks every tree in
+    lockstep for max_depth steps (leaves point to themselves), and the leaf values are averaged.
+    """
+
+    def __init__(self, children_left, children_right, feature, threshold, value, roots, max_depth):
+        self.children_left = children_left
+        self.children_right = children_right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+
+    def predict(self, features):
+        import numpy as np
+        rows = np.arange(len(features))[:, None]
+        nodes = np.tile(self.roots, (len(features), 1))
+        for _ in range(self.max_depth):
+            go_left = features[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+        return self.value[nodes].mean(axis=1)
+
+# Load a model exported by learner.export_model
+def load_compiled_model(filename):
+    """
+    Loads an .npz model written by learner.export_model. Only NumPy arrays are read (no pickle), so
+    this neither imports scikit-learn nor runs code from the file.
+    """
+    import numpy as np
+    with np.load(filename, allow_pickle=False) as data:
+        kind = str(data["kind"])
+        encoding = str(data["encoding"]) if "encoding" in data else "squares"
+        if encoding == "bitplanes":
+            if kind != "linear":
+                raise ValueError("Only linear models are supported with the bitplane encoding")
+            return BitplaneLinearModel(data["coef"], float(data["intercept"]))
+        if kind == "linear":
+            return LinearModel(data["coef"], float(data["intercept"]))
+        if kind == "trees":
+            return TreeEnsembleModel(data["children_left"], data["children_right"], data["feature"],
+                                     data["threshold"], data["value"], data["roots"], int(data["max_depth"]))
+    raise ValueError(f"Unknown model kind: {kind}")
 
 # Load the trained model
-def load_model(filename="best_model_killbillV2_Lasso.pkl"):
+def load_model(filename="best_model_killbillV2_Lasso.npz"):
     try:
-        with open(filename, "rb") as f:
-            model = pickle.load(f)
-        print(f"Loaded model from {filename}")
+        if filename.endswith(".npz"):
+            model = load_compiled_model(filename)
+        else:
+            with open(filename, "rb") as f:
+                model = pickle.load(f)
+        print(f"Loaded model from {filename}", file=sys.stderr)
         return model
     except Exception as e:
-        print(f"Error loading model: {e}")
+        print(f"Error loading model: {e}", file=sys.stderr)
         sys.exit(1)
 
 # Convert FEN to features for the model
@@ -43,109 +127,673 @@ def fen_to_features(fen):
         print(f"Error in fen_to_features: {e}")
         return []
 
+# Number of features produced by fen_to_features and board_to_features
+NUM_FEATURES = 129
+
+# Upper bound on the number of legal moves in any chess position
+MAX_MOVES = 256
+
+# Reused feature matrix for batched evaluation, one row per child position. Created on first use
+# so that NumPy is not imported before the engine has answered 'uci'.
+feature_buffer = None
+
+def get_feature_buffer():
+    """Returns the shared feature matrix, allocating it on first use."""
+    global feature_buffer
+    if feature_buffer is None:
+        import numpy as np
+        feature_buffer = np.zeros((MAX_MOVES, NUM_FEATURES))
+    return feature_buffer
+
+# Convert a board to features without going through FEN
+def board_to_features(board, out):
+    """
+    Writes the same features as fen_to_features into the preallocated row `out`, reading the
+    pieces straight from the board instead of serializing and reparsing a FEN.
+    """
+    out.fill(0)
+    for square, piece in board.piece_map().items():
+        out[2 * square] = piece.piece_type
+        out[2 * square + 1] = 1 if piece.color else 2
+    out[NUM_FEATURES - 1] = 0 if board.turn == chess.WHITE else 1
+    return out
+
 # Evaluate a board position using the model
 def evaluate_board(board, model):
     """
     Evaluates the board state using the model.
     """
-    try:
-        fen = board.fen()  # Get FEN representation of the board
-        features = fen_to_features(fen)  # Convert FEN to features
-        if not features:
-            raise ValueError("Feature extraction failed.")
-        evaluation = model.predict([features])[0]  # Predict using the model
-        return evaluation
-    except Exception as e:
-        print(f"Error in evaluate_board: {e}")
-        return float('-inf') if board.turn == chess.WHITE else float('inf')
+    if getattr(model, "encoding", "squares") == "bitplanes":
+        return model.predict([board_to_bitplane_indices(board)])[0]
+    features = get_feature_buffer()[:1]
+    board_to_features(board, features[0])
+    return model.predict(features)[0]
+
+# Evaluate every child position with a single model call
+def evaluate_moves(board, model, moves):
+    """
+    Returns the model evaluation of the position after each move. All children are written into
+    one feature matrix and scored with a single predict call.
+    """
+    if getattr(model, "encoding", "squares") == "bitplanes":
+        rows = []
+        for move in moves:
+            board.push(move)
+            rows.append(board_to_bitplane_indices(board))
+            board.pop()
+        return model.predict(rows)
+    features = get_feature_buffer()[:len(moves)]
+    for row, move in zip(features, moves):
+        board.push(move)
+        board_to_features(board, row)
+        board.pop()
+    return model.predict(features)
 
 # Select the best move based on evaluation
 def make_best_move(board, model):
     '''Returns the best move based on the model evaluation'''
     legal_moves = list(board.legal_moves)
     if not legal_moves:
-        print("No legal moves available. Game might be over.")
         return None
 
-    best_move = None
-    is_white_turn = board.turn  # Snapshot of turn state
-    best_evaluation = float('-inf') if is_white_turn else float('inf')
+    evaluations = evaluate_moves(board, model, legal_moves)
+    # White maximizes the evaluation, Black minimizes it
+    if board.turn == chess.WHITE:
+        best_index = max(range(len(legal_moves)), key=evaluations.__getitem__)
+    else:
+        best_index = min(range(len(legal_moves)), key=evaluations.__getitem__)
+    return legal_moves[best_index]
+
+# Score of a checkmate, beyond any evaluation the model produces. Mates found sooner score higher.
+MATE_SCORE = 100000
+
+# Evaluation cache keyed by zobrist hash, kept between moves
+eval_cache = {}
+
+# Entries kept in eval_cache or best_moves before both are cleared
+MAX_CACHE_SIZE = 1_000_000
+
+# Best move found for each searched position, used to read back the principal variation.
+# An abandoned iteration overwrites entries, so the line is read back after every completed one.
+best_moves = {}
 
-    print("Evaluating moves...")
-    for move in legal_moves:
+# Principal variation of the last completed iteration, which also supplies the ponder move
+principal_line = []
+
+def clear_caches():
+    """Empties the evaluation cache and the best move table."""
+    eval_cache.clear()
+    best_moves.clear()
+
+# Per-search counters, reset at the start of every search
+search_stats = {
+    "nodes": 0,  # positions generated by the search
+    "evaluations": 0,  # positions scored by the model
+    "cache_hits": 0,  # positions scored from eval_cache
+    "feature_time": 0.0,  # seconds spent in board_to_features
+    "predict_time": 0.0  # seconds spent in model.predict
+}
+
+# Deepest search used for 'go infinite' and 'go ponder'
+MAX_DEPTH = 64
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget for the move is used up or on 'stop'."""
+
+# Search limits shared between the UCI thread and the search thread. The UCI thread changes them
+# on 'stop' and 'ponderhit' while a search is running.
+search_stop = threading.Event()
+search_limits = {"deadline": None, "max_depth": MAX_DEPTH, "completed_depth": 0}
+
+def out_of_time():
+    """Returns True when the running search has to stop."""
+    deadline = search_limits["deadline"]
+    return search_stop.is_set() or (deadline is not None and time.perf_counter() > deadline)
+
+# Evaluate the children of a node in one batch, with caching
+def evaluate_children(board, model, moves, ply=0):
+    """
+    Returns the evaluation of the position after each move. Cached positions are looked up by
+    zobrist hash, the rest are written into one feature matrix and scored with a single predict
+    call. Children that are checkmate get the mate score instead of the model evaluation.
+    """
+    if len(eval_cache) > MAX_CACHE_SIZE or len(best_moves) > MAX_CACHE_SIZE:
+        clear_caches()
+    search_stats["nodes"] += len(moves)
+    values = [0.0] * len(moves)
+    keys = []
+    missing = []
+    # Dense models get rows of the shared feature matrix, bitplane models lists of set features
+    bitplanes = getattr(model, "encoding", "squares") == "bitplanes"
+    features = [] if bitplanes else get_feature_buffer()
+    for index, move in enumerate(moves):
         board.push(move)
+        if board.is_check() and board.is_checkmate():
+            mate = MATE_SCORE - ply - 1
+            values[index] = mate if board.turn == chess.BLACK else -mate
+        else:
+            key = chess.polyglot.zobrist_hash(board)
+            cached = eval_cache.get(key)
+            if cached is None:
+                start = time.perf_counter()
+                if bitplanes:
+                    features.append(board_to_bitplane_indices(board))
+                else:
+                    board_to_features(board, features[len(missing)])
+                search_stats["feature_time"] += time.perf_counter() - start
+                missing.append(index)
+                keys.append(key)
+            else:
+                values[index] = cached
+                search_stats["cache_hits"] += 1
+        board.pop()
+    if missing:
+        start = time.perf_counter()
+        predictions = model.predict(features[:len(missing)])
+        search_stats["predict_time"] += time.perf_counter() - start
+        search_stats["evaluations"] += len(missing)
+        for index, key, value in zip(missing, keys, predictions):
+            value = float(value)
+            values[index] = value
+            eval_cache[key] = value
+    return values
+
+# Depth-limited alpha-beta over the learned evaluation
+def alphabeta(board, model, depth, alpha, beta, ply=0):
+    """
+    Alpha-beta search that returns the evaluation of the board from White's point of view. Nodes
+    one ply above the horizon score all their children with one batched evaluate_children call, and
+    interior nodes use the same batched evaluations to try the most promising moves first.
+    """
+    if out_of_time():
+        raise SearchTimeout()
+    moves = list(board.legal_moves)
+    if not moves:
+        if board.is_check():
+            return -(MATE_SCORE - ply) if board.turn == chess.WHITE else MATE_SCORE - ply
+        return 0
+    maximizing_player = board.turn == chess.WHITE
+    values = evaluate_children(board, model, moves, ply)
+    ordered = sorted(zip(values, range(len(moves))), reverse=maximizing_player)
+    if depth <= 1:
+        best_eval, best_index = ordered[0]
+        best_moves[chess.polyglot.zobrist_hash(board)] = moves[best_index]
+        return best_eval
+
+    best_eval = float('-inf') if maximizing_player else float('inf')
+    best_move = None
+    for _, index in ordered:
+        board.push(moves[index])
         try:
-            evaluation = evaluate_board(board, model)
-            if evaluation is None:
-                print(f"Move {move.uci()} skipped: Evaluation returned None.")
-                board.pop()
-                continue  # Skip moves with evaluation errors
-        except Exception as e:
-            print(f"Error evaluating move {move.uci()}: {e}")
+            eval = alphabeta(board, model, depth - 1, alpha, beta, ply + 1)
+        finally:
             board.pop()
-            continue
+        if (maximizing_player and eval > best_eval) or (not maximizing_player and eval < best_eval):
+            best_eval, best_move = eval, moves[index]
+        if maximizing_player:
+            alpha = max(alpha, eval)
+        else:
+            beta = min(beta, eval)
+        if beta <= alpha:
+            break
+    best_moves[chess.polyglot.zobrist_hash(board)] = best_move
+    return best_eval
 
-        print(f"Move: {move.uci()}, Evaluation: {evaluation}")
+# Read back the principal variation
+def principal_variation(board, first_move, depth):
+    """Returns the expected line of play starting with first_move, up to depth moves long."""
+    line = [first_move]
+    board.push(first_move)
+    while len(line) < depth:
+        move = best_moves.get(chess.polyglot.zobrist_hash(board))
+        if move is None or not board.is_legal(move):
+            break
+        line.append(move)
+        board.push(move)
+    for _ in line:
+        board.pop()
+    return line
 
-        # Update the best move based on the current player's turn
-        if (is_white_turn and evaluation > best_evaluation) or \
-                (not is_white_turn and evaluation < best_evaluation):
-            print(f"Updating best move: {move.uci()} (Evaluation: {evaluation})")
-            best_move = move
-            best_evaluation = evaluation
+# Format a UCI score from the side to move's point of view
+def uci_score(board, eval):
+    """Converts a White point of view evaluation into a UCI 'cp' or 'mate' score."""
+    score = eval if board.turn == chess.WHITE else -eval
+    if abs(score) >= MATE_SCORE - 1000:
+        plies = MATE_SCORE - abs(score)
+        moves = (plies + 1) // 2
+        return f"mate {moves if score > 0 else -moves}"
+    return f"cp {int(round(score))}"
 
-        board.pop()
+# Report a finished iteration
+def send_info(board, depth, eval, line, start):
+    """Prints a UCI 'info' line for a completed iteration of the search and its principal variation."""
+    elapsed = time.perf_counter() - start
+    nodes = search_stats["nodes"]
+    pv = " ".join(move.uci() for move in line)
+    send(f"info depth {depth} score {uci_score(board, eval)} nodes {nodes} "
+         f"nps {int(nodes / elapsed) if elapsed > 0 else 0} time {int(elapsed * 1000)} pv {pv}")
+
+# Set the limits of the next search
+def set_search_limits(max_depth, time_limit=None):
+    """Sets the depth limit and time budget (seconds, None for no limit) used by iterative_deepening."""
+    search_limits["deadline"] = time.perf_counter() + time_limit if time_limit else None
+    search_limits["max_depth"] = max_depth
+    search_limits["completed_depth"] = 0
+
+# Pick the best move with iterative deepening alpha-beta
+def search_best_move(board, model, max_depth, time_limit=None):
+    """
+    Searches depth 1, 2, ... up to max_depth and returns the best move and score of the deepest
+    completed iteration. When time_limit (seconds) runs out the current iteration is abandoned.
+    """
+    search_stop.clear()
+    set_search_limits(max_depth, time_limit)
+    return iterative_deepening(board, model)
+
+# Iterative deepening within the current search limits
+def iterative_deepening(board, model):
+    """
+    Runs iterative deepening alpha-beta within search_limits, which the UCI thread may change
+    while it runs. The current iteration is abandoned when the deadline passes or 'stop' sets
+    search_stop. Prints an 'info' line after every completed iteration and keeps its principal
+    variation in principal_line.
+    """
+    principal_line.clear()
+    legal_moves = list(board.legal_moves)
+    if not legal_moves:
+        return None, 0
+    for key in search_stats:
+        search_stats[key] = 0
+    start = time.perf_counter()
+    search_limits["completed_depth"] = 1
+    maximizing_player = board.turn == chess.WHITE
+
+    # Depth 1 is the batched one-ply evaluation and always completes
+    values = evaluate_children(board, model, legal_moves)
+    ordered = sorted(zip(values, range(len(legal_moves))), reverse=maximizing_player)
+    best_move, best_eval = legal_moves[ordered[0][1]], ordered[0][0]
+    principal_line[:] = [best_move]
+    send_info(board, 1, best_eval, principal_line, start)
+
+    # The depth limit is read every iteration because 'ponderhit' may lower it
+    depth = 2
+    while depth <= search_limits["max_depth"]:
+        alpha, beta = float('-inf'), float('inf')
+        depth_best_move, depth_best_eval = None, None
+        try:
+            # Search the previous iteration's best move first
+            root_order = [best_move] + [legal_moves[index] for _, index in ordered if legal_moves[index] != best_move]
+            for move in root_order:
+                board.push(move)
+                try:
+                    eval = alphabeta(board, model, depth - 1, alpha, beta, 1)
+                finally:
+                    board.pop()
+                if depth_best_eval is None or (maximizing_player and eval > depth_best_eval) or \
+                        (not maximizing_player and eval < depth_best_eval):
+                    depth_best_move, depth_best_eval = move, eval
+                if maximizing_player:
+                    alpha = max(alpha, eval)
+                else:
+                    beta = min(beta, eval)
+        except SearchTimeout:
+            break
+        best_move, best_eval = depth_best_move, depth_best_eval
+        search_limits["completed_depth"] = depth
+        principal_line[:] = principal_variation(board, best_move, depth)
+        send_info(board, depth, best_eval, principal_line, start)
+        depth += 1
+
+    debug_log(f"search: {search_stats['nodes']} nodes, {search_stats['evaluations']} positions evaluated, "
+              f"{search_stats['cache_hits']} cache hits, "
+              f"feature extraction {search_stats['feature_time'] * 1000:.1f} ms, "
+              f"predict {search_stats['predict_time'] * 1000:.1f} ms, "
+              f"total {(time.perf_counter() - start) * 1000:.1f} ms")
+    return best_move, best_eval
+
+# Fixed positions searched by 'bench': the start position, tactical middlegames and endgames
+BENCH_POSITIONS = [
+    chess.STARTING_FEN,
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+    "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1",
+]
+
+# Default depth of 'bench'
+BENCH_DEPTH = 3
+
+# Search the bench positions
+def bench(model, depth=BENCH_DEPTH):
+    """
+    Searches every bench position to a fixed depth, starting each one with empty caches, and
+    returns the total nodes and the elapsed seconds. The node count is a signature that only
+    changes when the search or the model changes.
+    """
+    nodes = 0
+    start = time.perf_counter()
+    for fen in BENCH_POSITIONS:
+        clear_caches()
+        search_best_move(chess.Board(fen), model, depth)
+        nodes += search_stats["nodes"]
+    return nodes, time.perf_counter() - start
+
+# Report a bench run
+def print_bench(model, depth=BENCH_DEPTH):
+    """Runs the bench and prints the total nodes, time and nodes per second."""
+    nodes, elapsed = bench(model, depth)
+    send(f"Positions       : {len(BENCH_POSITIONS)} at depth {depth}")
+    send(f"Total time (ms) : {elapsed * 1000:.0f}")
+    send(f"Nodes searched  : {nodes}")
+    send(f"Nodes/second    : {nodes / elapsed:.0f}")
+
+# Decide how long to think about a move
+def allocate_time(args, turn):
+    """
+    Returns the time budget in seconds for a 'go' command, or None when the search is only limited
+    by depth. Uses movetime when given, otherwise a share of the remaining clock plus increment.
+    """
+    def arg(name):
+        return int(args[args.index(name) + 1]) / 1000 if name in args else None
+
+    if arg("movetime") is not None:
+        return arg("movetime")
+    remaining = arg("wtime") if turn == chess.WHITE else arg("btime")
+    if remaining is None:
+        return None
+    increment = (arg("winc") if turn == chess.WHITE else arg("binc")) or 0
+    return min(remaining / 30 + increment / 2, remaining / 3)
+
+# Open a Polyglot opening book
+def open_book(book_path):
+    """
+    Opens a Polyglot opening book. The file is memory mapped and probed with a binary search on the
+    zobrist key of the position. Returns None if the book cannot be opened.
+    """
+    try:
+        return chess.polyglot.open_reader(book_path)
+    except OSError:
+        return None
+
+# Pick a move from the opening book
+def book_move(board, book, mode="weighted"):
+    """
+    Returns a book move for the board, either the highest weighted entry ('best') or a random entry
+    chosen in proportion to the weights ('weighted'). Returns None when the position is out of book.
+    """
+    if book is None:
+        return None
+    try:
+        if mode == "best":
+            return book.find(board).move
+        return book.weighted_choice(board).move
+    except IndexError:
+        return None
 
-    if best_move:
-        print(f"Selected best move: {best_move.uci()} with evaluation {best_evaluation}")
-    else:
-        print("No valid best move found.")
-    return best_move
 
 
 
+# The model is loaded in the background so the engine can answer 'uci' and 'isready' at once.
+# The compiled .npz model only needs NumPy; the pickled model is still accepted but imports
+# scikit-learn, which dominates startup time.
+MODEL_FILE = "best_model_killbillV2_Lasso.npz"
+model = None
+model_loader = None
 
-# Load the model
-model = load_model("best_model_killbillV2_Lasso.pkl")
+def start_loading_model(filename=MODEL_FILE):
+    """Starts loading the model on a background thread. The previous model is dropped."""
+    global model_loader, model
+    model = None
+
+    def load():
+        global model
+        try:
+            model = load_model(filename)
+        except SystemExit:
+            # load_model has reported the error; get_model exits the engine when the model is needed
+            model = None
+
+    model_loader = threading.Thread(target=load, daemon=True)
+    model_loader.start()
+
+def get_model():
+    """
+    Returns the model, waiting for the background load to finish if needed. Exits the engine when
+    the model could not be loaded, so it must be called on the UCI thread rather than the search
+    thread, where sys.exit would only end the thread.
+    """
+    if model_loader is None:
+        start_loading_model()
+    model_loader.join()
+    if model is None:
+        print(f"No model loaded from {options['ModelFile']}, exiting", file=sys.stderr)
+        sys.exit(1)
+    return model
 
 board = chess.Board()
 
+# Engine options that can be changed with 'setoption'
+options = {
+    "Depth": 3,
+    "ModelFile": MODEL_FILE,
+    "BookFile": "",
+    "BookMode": "weighted",
+    "DebugLogFile": ""
+}
+
+# Opened Polyglot book, or None when no book is configured
+opening_book = None
+
+# Debug output is off unless enabled with 'debug on'. It goes to stderr, or to DebugLogFile when
+# set, so it never mixes with the UCI protocol on stdout.
+debug_enabled = False
+debug_file = None
+
+# Serializes output from the UCI thread and the search thread
+output_lock = threading.Lock()
+
+def send(line):
+    """Writes one line of UCI protocol output."""
+    with output_lock:
+        print(line, flush=True)
+
+def debug_log(message):
+    """Writes a debug message to the debug channel when debugging is enabled."""
+    if not debug_enabled:
+        return
+    stream = debug_file or sys.stderr
+    print(f"{time.strftime('%H:%M:%S')} {message}", file=stream, flush=True)
+
+def set_debug_file(path):
+    """Sends debug output to a log file instead of stderr. An empty path restores stderr."""
+    global debug_file
+    if debug_file is not None:
+        debug_file.close()
+    debug_file = open(path, "a") if path and path != "<empty>" else None
+    options["DebugLogFile"] = path
+
+def set_book(book_path):
+    """Replaces the opening book. An empty path disables book moves."""
+    global opening_book
+    if opening_book is not None:
+        opening_book.close()
+    opening_book = open_book(book_path) if book_path and book_path != "<empty>" else None
+    options["BookFile"] = book_path
+
+# The search runs on its own thread so that 'stop', 'ponderhit', 'isready' and 'quit' are read
+# while it is thinking. eval_cache and best_moves are kept between searches.
+search_thread = None
+
+# Cleared while in 'go infinite' or 'go ponder': bestmove may only be sent after 'stop' or
+# 'ponderhit', even if the search finishes earlier.
+bestmove_allowed = threading.Event()
+
+# The arguments of the running 'go' command, used to budget time on 'ponderhit'
+search_args = []
+
+def run_search(position, model):
+    """
+    Search thread body: finds a move for the position within search_limits and sends 'bestmove'.
+    If the search fails, the error goes to stderr and the best move of the last completed
+    iteration (or '(none)') is still sent, so the GUI is never left waiting.
+    """
+    move, ponder = None, None
+    principal_line.clear()
+    try:
+        move = book_move(position, opening_book, options["BookMode"])
+        if move is None:
+            move, _ = iterative_deepening(position, model)
+            if move is not None and len(principal_line) > 1:
+                ponder = principal_line[1]
+    except Exception as e:
+        print(f"Search error: {e!r}", file=sys.stderr, flush=True)
+        move = principal_line[0] if principal_line else None
+        ponder = principal_line[1] if len(principal_line) > 1 else None
+    finally:
+        bestmove_allowed.wait()
+        if move is None:
+            send("bestmove (none)")
+        elif ponder is not None:
+            send(f"bestmove {move.uci()} ponder {ponder.uci()}")
+        else:
+            send(f"bestmove {move.uci()}")
+
+def start_search(args):
+    """Starts a search of the current board for a 'go' command."""
+    global search_thread, search_args
+    stop_search()
+    # Resolved here so that a missing model ends the engine instead of silently ending the search thread
+    search_model = get_model()
+    search_stop.clear()
+    search_args = args
+    infinite = "infinite" in args or "ponder" in args
+    if infinite:
+        # Think until 'stop' or 'ponderhit'
+        bestmove_allowed.clear()
+        depth, time_limit = MAX_DEPTH, None
+    else:
+        bestmove_allowed.set()
+        depth = int(args[args.index("depth") + 1]) if "depth" in args else options["Depth"]
+        time_limit = allocate_time(args, board.turn)
+    set_search_limits(depth, time_limit)
+    search_thread = threading.Thread(target=run_search, args=(board.copy(), search_model), daemon=True)
+    search_thread.start()
+
+def stop_search():
+    """Stops the running search, if any, and waits for it to send its 'bestmove'."""
+    global search_thread
+    if search_thread is None:
+        return
+    search_stop.set()
+    bestmove_allowed.set()
+    search_thread.join()
+    search_thread = None
+
+def ponder_hit():
+    """
+    The opponent played the expected move: the ponder search carries on as a normal search with
+    the time budget and depth of the original 'go ponder' command.
+    """
+    if search_thread is None:
+        return
+    args = search_args
+    depth = int(args[args.index("depth") + 1]) if "depth" in args else options["Depth"]
+    completed_depth = search_limits["completed_depth"]
+    set_search_limits(depth, allocate_time(args, board.turn))
+    search_limits["completed_depth"] = completed_depth
+    if completed_depth >= depth:
+        # Already searched deep enough while pondering
+        search_stop.set()
+    bestmove_allowed.set()
+
 def uci(msg: str):
     '''Processes UCI commands with the internal board state'''
     if msg == "uci":
         print("id name Chess Bot")
         print("id author Your Name")
+        print("option name Depth type spin default 3 min 1 max 8")
+        print("option name Ponder type check default false")
+        print(f"option name ModelFile type string default {MODEL_FILE}")
+        print("option name BookFile type string default <empty>")
+        print("option name BookMode type combo default weighted var weighted var best")
+        print("option name DebugLogFile type string default <empty>")
         print("uciok")
     elif msg == "isready":
-        print("readyok")
-    elif msg.startswith("position startpos moves"):
+        # Ready only once a model being loaded (at startup or after 'setoption name ModelFile') is in
+        if model_loader is not None:
+            model_loader.join()
+        send("readyok")
+    elif msg.startswith("setoption name "):
+        name, _, value = msg.removeprefix("setoption name ").partition(" value ")
+        if name == "Depth":
+            options["Depth"] = int(value)
+        elif name == "ModelFile":
+            # Cached evaluations belong to the previous model
+            stop_search()
+            clear_caches()
+            options["ModelFile"] = value
+            start_loading_model(value)
+        elif name == "BookFile":
+            # The search thread may be reading the book that is about to be closed
+            stop_search()
+            set_book(value)
+        elif name == "BookMode":
+            options["BookMode"] = value
+        elif name == "DebugLogFile":
+            stop_search()
+            set_debug_file(value)
+    elif msg in ("debug on", "debug off"):
+        global debug_enabled
+        debug_enabled = msg == "debug on"
+    elif msg == "ucinewgame":
+        stop_search()
+        clear_caches()
+    elif msg.startswith("position startpos"):
         board.clear()
         board.set_fen(chess.STARTING_FEN)
         moves = msg.split()[3:]
         for move in moves:
             board.push(chess.Move.from_uci(move))
     elif msg.startswith("position fen"):
-        fen = msg.removeprefix("position fen ")
+        fen, _, moves = msg.removeprefix("position fen ").partition(" moves ")
         board.set_fen(fen)
+        for move in moves.split():
+            board.push(chess.Move.from_uci(move))
     elif msg.startswith("go"):
-        move = make_best_move(board, model)  # Fix: Include 'board' as an argument
-        if move:
-            print(f"bestmove {move.uci()}")
-        else:
-            print("bestmove (none)")
+        start_search(msg.split())
+    elif msg == "stop":
+        stop_search()
+    elif msg == "ponderhit":
+        ponder_hit()
+    elif msg.startswith("bench"):
+        # Runs on the UCI thread; the caches it clears are rebuilt by the next search
+        stop_search()
+        args = msg.split()
+        print_bench(get_model(), int(args[1]) if len(args) > 1 else BENCH_DEPTH)
     elif msg == "quit":
+        stop_search()
         sys.exit(0)
     else:
-        print(f"Unknown command: {msg}")
+        debug_log(f"Unknown command: {msg}")
 
 
 def main():
-    '''Main loop to process UCI commands'''
+    '''Main loop to process UCI commands. 'python killbillV2.py bench [depth]' runs the bench instead.'''
+    start_loading_model()
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        print_bench(get_model(), int(sys.argv[2]) if len(sys.argv) > 2 else BENCH_DEPTH)
+        return
     try:
         while True:
             uci(input())
+            sys.stdout.flush()
+    except EOFError:
+        stop_search()
     except Exception as e:
-        print(f"Fatal Error: {e}")
+        print(f"Fatal Error: {e}", file=sys.stderr)
 
 if __name__ == "__main__":
     main()
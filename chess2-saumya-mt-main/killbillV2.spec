@@ -0,0 +1,34 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Slim build of the killbillV2 UCI engine: pyinstaller killbillV2.spec
+# The bot loads the compiled .npz model with plain NumPy, so scikit-learn and SciPy are left out along
+# with the plotting and notebook packages. A pickled model cannot be loaded from this build.
+
+a = Analysis(
+    ['killbillV2.py'],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=['sklearn', 'scipy', 'networkx', 'matplotlib', 'pandas', 'PIL', 'tkinter', 'IPython', 'notebook'],
+    noarchive=False,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.datas,
+    [],
+    name='killbillV2',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    runtime_tmpdir=None,
+    console=True,
+)
@@ -1,11 +1,24 @@
+import copy
 import csv
+import hashlib
+import math
+import multiprocessing
+import os
+import queue
+import time
 import chess
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression, Ridge, Lasso
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.model_selection import train_test_split, KFold
+from sklearn.linear_model import LinearRegression, Ridge, Lasso, SGDRegressor
+from sklearn.preprocessing import StandardScaler
 from sklearn.tree import DecisionTreeRegressor
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 import pickle
+import sys
+import numpy as np
+import scipy.sparse
+from bitplanes import fens_to_csr
 
 def fen_to_features(fen):
     """
@@ -48,6 +61,141 @@ def load_dataset(filename):
             y.append(evaluation)
     return x, y
 
+# Number of features produced by fen_to_features
+NUM_FEATURES = 129
+
+# Directory holding cached feature matrices, keyed by a hash of the dataset file
+FEATURE_STORE_DIR = "feature_store"
+
+# Lookup tables from FEN piece characters to the piece type (1-6) and color (1 white, 2 black)
+# codes used by fen_to_features; '.' marks an empty square
+PIECE_TYPE_CODES = np.zeros(256, dtype=np.uint8)
+PIECE_COLOR_CODES = np.zeros(256, dtype=np.uint8)
+for symbol in "pnbrqk":
+    PIECE_TYPE_CODES[ord(symbol)] = PIECE_TYPE_CODES[ord(symbol.upper())] = chess.PIECE_SYMBOLS.index(symbol)
+    PIECE_COLOR_CODES[ord(symbol.upper())] = 1
+    PIECE_COLOR_CODES[ord(symbol)] = 2
+
+# Expands the digits of a FEN piece placement into runs of empty squares and drops the rank separators
+FEN_EXPANSION = {ord(str(n)): "." * n for n in range(1, 9)}
+FEN_EXPANSION[ord("/")] = ""
+
+# FEN lists squares from a8 to h1; entry i is the chess.SQUARES index of the i-th FEN square
+FEN_SQUARE_ORDER = np.array([chess.square(i % 8, 7 - i // 8) for i in range(64)])
+
+def fens_to_features(fens):
+    """
+    Vectorized fen_to_features for a list of FEN strings. The piece placement is parsed straight
+    into a uint8 array without building a chess.Board, giving one row of 129 features per FEN.
+    """
+    placements = []
+    turns = np.empty(len(fens), dtype=np.uint8)
+    for i, fen in enumerate(fens):
+        placement, turn = fen.split(" ", 2)[:2]
+        expanded = placement.translate(FEN_EXPANSION)
+        if len(expanded) != 64:
+            raise ValueError(f"Invalid FEN piece placement: {fen}")
+        placements.append(expanded)
+        turns[i] = turn == "b"
+    squares = np.frombuffer("".join(placements).encode("ascii"), dtype=np.uint8).reshape(len(fens), 64)
+    squares = squares[:, np.argsort(FEN_SQUARE_ORDER)]  # Reorder from FEN order to a1..h8
+    features = np.empty((len(fens), NUM_FEATURES), dtype=np.uint8)
+    features[:, 0:128:2] = PIECE_TYPE_CODES[squares]
+    features[:, 1:128:2] = PIECE_COLOR_CODES[squares]
+    features[:, 128] = turns
+    return features
+
+def dataset_hash(filename):
+    """
+    Returns a hash of the dataset file contents, used to key the feature store.
+    """
+    digest = hashlib.sha1()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+def read_fens_and_targets(filename):
+    """
+    Reads the FEN and evaluation columns of the dataset CSV.
+    """
+    fens = []
+    targets = []
+    with open(filename, 'r') as csvfile:
+        for row in csv.DictReader(csvfile):
+            fens.append(row['fen'])
+            targets.append(float(row['eval']))
+    return fens, targets
+
+def build_feature_store(filename, encoding="squares", workers=None, chunk_size=50000):
+    """
+    Makes sure the feature store holds the features of the dataset in the given encoding and
+    returns the paths of the features and targets files. The first time a dataset is seen, the FENs
+    are converted in chunks across a process pool and saved under names derived from the dataset
+    hash, so later runs on the same file skip extraction.
+
+    'squares' stores the dense fen_to_features encoding as a memory-mapped uint8 .npy file.
+    'bitplanes' stores the sparse 12x64 one-hot encoding from bitplanes.py as a CSR .npz file.
+    """
+    key = dataset_hash(filename)
+    if encoding == "squares":
+        features_path = os.path.join(FEATURE_STORE_DIR, f"{key}_features.npy")
+    elif encoding == "bitplanes":
+        features_path = os.path.join(FEATURE_STORE_DIR, f"{key}_bitplanes.npz")
+    else:
+        raise ValueError(f"Unsupported feature encoding: {encoding}")
+    targets_path = os.path.join(FEATURE_STORE_DIR, f"{key}_targets.npy")
+    if os.path.exists(features_path) and os.path.exists(targets_path):
+        print(f"Using cached features from {features_path}")
+        return features_path, targets_path
+
+    fens, targets = read_fens_and_targets(filename)
+    os.makedirs(FEATURE_STORE_DIR, exist_ok=True)
+    chunks = [fens[start:start + chunk_size] for start in range(0, len(fens), chunk_size)]
+    # Write to temporary names first so an interrupted run never leaves a partial store behind
+    if encoding == "squares":
+        features = np.lib.format.open_memmap(features_path + ".tmp", mode="w+", dtype=np.uint8,
+                                             shape=(len(fens), NUM_FEATURES))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for index, chunk_features in enumerate(pool.map(fens_to_features, chunks)):
+                features[index * chunk_size:index * chunk_size + len(chunk_features)] = chunk_features
+        features.flush()
+        del features
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            features = scipy.sparse.vstack(list(pool.map(fens_to_csr, chunks)), format="csr")
+        sparse_bytes = features.data.nbytes + features.indices.nbytes + features.indptr.nbytes
+        dense_bytes = features.shape[0] * features.shape[1] * np.dtype(np.float64).itemsize
+        print(f"Bitplane features use {sparse_bytes / 1e6:.1f} MB sparse, "
+              f"{dense_bytes / 1e6:.1f} MB as dense float rows")
+        with open(features_path + ".tmp", "wb") as f:
+            scipy.sparse.save_npz(f, features)
+    with open(targets_path + ".tmp", "wb") as f:
+        np.save(f, np.array(targets, dtype=np.float64))
+    os.replace(features_path + ".tmp", features_path)
+    os.replace(targets_path + ".tmp", targets_path)
+    print(f"Extracted features for {len(fens)} positions into {features_path}")
+    return features_path, targets_path
+
+def load_features(path):
+    """
+    Opens a features file from the feature store: .npy files are memory mapped read-only and .npz
+    files are loaded as a sparse CSR matrix.
+    """
+    if path.endswith(".npz"):
+        return scipy.sparse.load_npz(path).tocsr()
+    return np.load(path, mmap_mode="r")
+
+def load_dataset_fast(filename, encoding="squares", workers=None, chunk_size=50000):
+    """
+    Loads the features and targets of the dataset through the feature store.
+    """
+    features_path, targets_path = build_feature_store(filename, encoding, workers, chunk_size)
+    return load_features(features_path), np.load(targets_path, mmap_mode="r")
+
+# Model types export_model stores as coefficients, the only kind the bot accepts for bitplanes
+LINEAR_MODEL_TYPES = ("Linear", "Ridge", "Lasso")
+
 def train_model(x_train, y_train, model_type):
     """
     Trains a regression model using the provided training data.
@@ -61,7 +209,8 @@ def train_model(x_train, y_train, model_type):
     elif model_type == "DecisionTree":
         model = DecisionTreeRegressor()
     elif model_type == "RandomForest":
-        model = RandomForestRegressor()
+        # One job per forest: model selection already runs one candidate per core
+        model = RandomForestRegressor(n_jobs=1)
     else:
         raise ValueError(f"Unsupported model type: {model_type}")
 
@@ -87,38 +236,329 @@ def save_model(model, filename):
         pickle.dump(model, f)
     print(f"Model saved to {filename}")
 
-def main():
-    # Load dataset
-    x, y = load_dataset('chess_evaluations.csv')
+def flatten_trees(trees):
+    """
+    Concatenates fitted sklearn trees into flat node arrays. Child indices are offset to point into
+    the concatenated arrays, and leaves point to themselves so that inference can walk every tree a
+    fixed number of steps.
+    """
+    children_left, children_right, feature, threshold, value, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree in trees:
+        t = tree.tree_
+        nodes = np.arange(t.node_count)
+        is_leaf = t.children_left == -1
+        children_left.append(np.where(is_leaf, nodes, t.children_left) + offset)
+        children_right.append(np.where(is_leaf, nodes, t.children_right) + offset)
+        feature.append(np.where(is_leaf, 0, t.feature))
+        threshold.append(t.threshold)
+        value.append(t.value[:, 0, 0])
+        roots.append(offset)
+        offset += t.node_count
+        max_depth = max(max_depth, t.max_depth)
+    return {
+        "children_left": np.concatenate(children_left).astype(np.int32),
+        "children_right": np.concatenate(children_right).astype(np.int32),
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "value": np.concatenate(value).astype(np.float64),
+        "roots": np.array(roots, dtype=np.int32),
+        "max_depth": np.array(max_depth),
+    }
 
-    # Split dataset into training and testing sets
-    x_train, x_test, y_train, y_test = train_test_split(x, y, test_size=0.2, random_state=42)
+def export_model(model, filename, encoding="squares"):
+    """
+    Saves a trained model as raw NumPy arrays in an .npz file, so the bot can run inference without
+    scikit-learn or unpickling. Linear models are stored as coefficients and an intercept, and tree
+    models (DecisionTree, RandomForest) as flattened node arrays. The feature encoding the model was
+    trained on is stored with it. The bot runs bitplane models as sums of coefficients, so tree
+    models on the bitplane encoding are rejected.
+    """
+    if encoding == "bitplanes" and not hasattr(model, "coef_"):
+        raise ValueError(f"Only linear models can be exported with the bitplane encoding, "
+                         f"not {type(model).__name__}")
+    if hasattr(model, "coef_"):
+        arrays = {
+            "kind": np.array("linear"),
+            "coef": np.asarray(model.coef_, dtype=np.float64).ravel(),
+            "intercept": np.array(float(np.ravel(model.intercept_)[0])),
+        }
+    elif hasattr(model, "estimators_"):
+        arrays = dict(kind=np.array("trees"), **flatten_trees(model.estimators_))
+    elif hasattr(model, "tree_"):
+        arrays = dict(kind=np.array("trees"), **flatten_trees([model]))
+    else:
+        raise ValueError(f"Cannot export model of type {type(model).__name__}")
+    arrays["encoding"] = np.array(encoding)
+    np.savez(filename, **arrays)
+    print(f"Compiled model saved to {filename}")
 
-    # Define the models to train
-    model_types = ["Linear", "Ridge", "Lasso", "DecisionTree", "RandomForest"]
+# Rows in the batch used to measure inference latency, about one position's worth of moves
+LATENCY_BATCH = 30
 
-    # Track the best model and its performance
-    best_model = None
-    best_model_type = None
-    best_performance = float('-inf')  # Initialize with the worst possible value
+def measure_latency(model, x, repeats=50):
+    """
+    Returns the average time in microseconds for one predict call on a batch of LATENCY_BATCH rows,
+    which is what the bot pays per node it expands.
+    """
+    batch = x[:LATENCY_BATCH]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        model.predict(batch)
+    return (time.perf_counter() - start) / repeats * 1e6
 
-    # Train and evaluate each model
-    for model_type in model_types:
-        print(f"Training {model_type} model...")
+def cross_validate_candidate(task):
+    """
+    Runs k-fold cross-validation of one model type on a subset of the rows. The feature store is
+    opened memory-mapped, so every worker shares the same read-only pages instead of a copy
+    (sparse bitplane stores are small enough to load per worker).
+    Returns the mean R-squared, the mean training time and the inference latency.
+    """
+    model_type, features_path, targets_path, rows, folds = task
+    x = load_features(features_path)
+    y = np.load(targets_path, mmap_mode="r")
+    scores, train_times = [], []
+    model = None
+    for train_rows, test_rows in KFold(n_splits=folds, shuffle=True, random_state=42).split(rows):
+        x_train, y_train = x[rows[train_rows]], y[rows[train_rows]]
+        start = time.perf_counter()
         model = train_model(x_train, y_train, model_type)
+        train_times.append(time.perf_counter() - start)
+        scores.append(r2_score(y[rows[test_rows]], model.predict(x[rows[test_rows]])))
+    return {
+        "r2": float(np.mean(scores)),
+        "train_time": float(np.mean(train_times)),
+        "latency_us": measure_latency(model, x[rows[:LATENCY_BATCH]]),
+    }
+
+def _candidate_worker(task, results):
+    """Process entry point: cross-validates one candidate and posts the result to the queue."""
+    results.put((task[0], cross_validate_candidate(task)))
+
+def run_candidates(tasks, workers, time_budget=None):
+    """
+    Runs the cross-validation tasks in up to `workers` concurrent processes. A candidate still
+    running after time_budget seconds is terminated. Returns a dict from model type to its result,
+    or to None when it ran out of time or failed.
+    """
+    context = multiprocessing.get_context()
+    results_queue = context.Queue()
+    pending = list(tasks)
+    running = {}  # model type -> (process, start time)
+    results = {}
+    while pending or running:
+        while pending and len(running) < workers:
+            task = pending.pop(0)
+            process = context.Process(target=_candidate_worker, args=(task, results_queue), daemon=True)
+            process.start()
+            running[task[0]] = (process, time.monotonic())
+        try:
+            model_type, result = results_queue.get(timeout=0.1)
+            results[model_type] = result
+            running.pop(model_type)[0].join()
+        except queue.Empty:
+            pass
+        for model_type, (process, started) in list(running.items()):
+            if time_budget is not None and time.monotonic() - started > time_budget:
+                print(f"[{model_type}] Exceeded the time budget of {time_budget}s, stopping it")
+                process.terminate()
+            elif process.is_alive() or process.exitcode == 0:
+                continue  # Still running, or finished with its result on the way
+            process.join()
+            running.pop(model_type)
+            results[model_type] = None
+    return results
+
+def select_model(features_path, targets_path, model_types, rows, folds=5, workers=None,
+                 time_budget=None, rungs=(0.25, 0.5, 1.0)):
+    """
+    Picks the best model type by k-fold cross-validation, training candidates concurrently.
+    Candidates are compared with successive halving: every rung cross-validates the remaining
+    candidates on a larger share of the rows and keeps the better half, so hopeless models never
+    see the full dataset. Prints R-squared, training time and inference latency for every run and
+    returns the best model type with its final result.
+    """
+    workers = workers or os.cpu_count()
+    shuffled = np.random.default_rng(42).permutation(rows)
+    candidates = list(model_types)
+    results = {}
+    for rung, share in enumerate(rungs):
+        subset = shuffled[:max(folds * 2, int(len(shuffled) * share))]
+        tasks = [(model_type, features_path, targets_path, subset, folds) for model_type in candidates]
+        results = run_candidates(tasks, workers, time_budget)
+        for model_type in candidates:
+            result = results[model_type]
+            if result is None:
+                print(f"[{model_type}] rung {rung} ({len(subset)} rows): dropped")
+            else:
+                print(f"[{model_type}] rung {rung} ({len(subset)} rows): R-squared {result['r2']:.4f}, "
+                      f"training {result['train_time']:.2f}s, "
+                      f"inference {result['latency_us']:.0f}us per {LATENCY_BATCH} positions")
+        ranked = sorted((model_type for model_type in candidates if results[model_type] is not None),
+                        key=lambda model_type: results[model_type]["r2"], reverse=True)
+        if not ranked:
+            raise RuntimeError("No model finished within the time budget")
+        if rung < len(rungs) - 1:
+            candidates = ranked[:max(1, math.ceil(len(ranked) / 2))]
+        else:
+            candidates = ranked
+    return candidates[0], results[candidates[0]]
+
+# Rows per chunk when streaming the dataset; this bounds the memory used by streaming training
+STREAM_CHUNK_SIZE = 10000
+
+# Every VALIDATION_EVERY-th row of the CSV is held out as the validation stream (20% of the rows)
+VALIDATION_EVERY = 5
+
+def stream_dataset(filename, encoding="squares", validation=False, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yields the dataset as (features, targets) chunks of at most chunk_size rows, reading the CSV
+    incrementally so only one chunk is ever in memory. Rows are split by their position in the file:
+    every VALIDATION_EVERY-th row belongs to the validation stream and the rest to the training stream.
+    """
+    if encoding == "squares":
+        encode = fens_to_features
+    elif encoding == "bitplanes":
+        encode = fens_to_csr
+    else:
+        raise ValueError(f"Unsupported feature encoding: {encoding}")
+    fens, targets = [], []
+    with open(filename, 'r') as csvfile:
+        for index, row in enumerate(csv.DictReader(csvfile)):
+            if (index % VALIDATION_EVERY == 0) != validation:
+                continue
+            fens.append(row['fen'])
+            targets.append(float(row['eval']))
+            if len(fens) == chunk_size:
+                yield encode(fens), np.array(targets, dtype=np.float64)
+                fens, targets = [], []
+    if fens:
+        yield encode(fens), np.array(targets, dtype=np.float64)
+
+def make_streaming_model(encoding):
+    """
+    Creates a linear model that can be trained incrementally with partial_fit. Averaged SGD is
+    used because its averaged coefficients settle close to the batch least-squares solution. The
+    step size suits standardized targets: dense standardized 'squares' features use a decaying
+    step, while the sparse binary 'bitplanes' features, most of which are seldom set, need a
+    constant one to keep learning.
+    """
+    if encoding == "bitplanes":
+        return SGDRegressor(learning_rate="constant", eta0=0.01, average=True, random_state=42)
+    return SGDRegressor(learning_rate="invscaling", eta0=0.01, average=True, random_state=42)
+
+def validate_streaming(model, scaler, target_scaler, filename, encoding, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Scores the model on the validation stream in centipawns, accumulating the error sums chunk by
+    chunk. Returns the mean squared error and R-squared.
+    """
+    rows, squared_error, target_sum, target_square_sum = 0, 0.0, 0.0, 0.0
+    for x_chunk, y_chunk in stream_dataset(filename, encoding, True, chunk_size):
+        if scaler is not None:
+            x_chunk = scaler.transform(x_chunk)
+        predictions = model.predict(x_chunk) * target_scaler.scale_[0] + target_scaler.mean_[0]
+        squared_error += float(np.sum((predictions - y_chunk) ** 2))
+        target_sum += float(np.sum(y_chunk))
+        target_square_sum += float(np.sum(y_chunk ** 2))
+        rows += len(y_chunk)
+    total_variance = target_square_sum - target_sum ** 2 / rows
+    return squared_error / rows, 1 - squared_error / total_variance
+
+def fold_scalers(model, scaler, target_scaler):
+    """
+    Folds the feature standardization (if any) and the target standardization into the coefficients
+    of a linear model so that it predicts centipawns from raw features, which is what export_model
+    and the bot expect.
+    """
+    coef = model.coef_ * target_scaler.scale_[0]
+    intercept = float(model.intercept_[0]) * target_scaler.scale_[0] + target_scaler.mean_[0]
+    if scaler is not None:
+        coef = coef / scaler.scale_
+        intercept -= float(np.dot(coef, scaler.mean_))
+    model.coef_ = coef
+    model.intercept_ = np.array([intercept])
+    return model
+
+def train_streaming(filename, encoding="squares", epochs=50, patience=3, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Trains a linear model out of core: each epoch streams the training rows of the CSV in chunks
+    through partial_fit and then scores the held-out validation stream. Memory use depends on
+    chunk_size, not on the size of the dataset. Training stops after `patience` epochs without
+    a better validation error, and the best model seen is returned.
+
+    A first pass over the training stream gathers the statistics used to standardize the targets
+    and, for dense 'squares' features, the features. Both scalings are folded back into the
+    returned model's coefficients.
+    """
+    scaler = StandardScaler() if encoding == "squares" else None
+    target_scaler = StandardScaler()
+    for x_chunk, y_chunk in stream_dataset(filename, encoding, False, chunk_size):
+        if scaler is not None:
+            scaler.partial_fit(x_chunk)
+        target_scaler.partial_fit(y_chunk.reshape(-1, 1))
+    model = make_streaming_model(encoding)
+    rng = np.random.default_rng(42)
+    best_model, best_mse, stale_epochs = None, math.inf, 0
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        rows = 0
+        for x_chunk, y_chunk in stream_dataset(filename, encoding, False, chunk_size):
+            # Shuffle within the chunk so consecutive updates do not come from the same game
+            order = rng.permutation(len(y_chunk))
+            x_chunk, y_chunk = x_chunk[order], y_chunk[order]
+            if scaler is not None:
+                x_chunk = scaler.transform(x_chunk)
+            model.partial_fit(x_chunk, target_scaler.transform(y_chunk.reshape(-1, 1)).ravel())
+            rows += len(y_chunk)
+        mse, r2 = validate_streaming(model, scaler, target_scaler, filename, encoding, chunk_size)
+        print(f"[SGD] epoch {epoch + 1}: {rows} rows in {time.perf_counter() - start:.1f}s, "
+              f"validation MSE {mse:.1f}, R-squared {r2:.4f}")
+        if mse < best_mse:
+            best_model, best_mse, stale_epochs = copy.deepcopy(model), mse, 0
+        else:
+            stale_epochs += 1
+            if stale_epochs >= patience:
+                break
+    return fold_scalers(best_model, scaler, target_scaler)
+
+def main():
+    # Feature encoding: 'squares' (default) or the sparse 'bitplanes' encoding
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    encoding = args[0] if args else "squares"
+    suffix = "" if encoding == "squares" else f"_{encoding}"
+
+    # Streaming mode: train an SGD model chunk by chunk without loading the dataset into memory
+    if "--stream" in sys.argv:
+        model = train_streaming('chess_evaluations.csv', encoding)
+        save_model(model, f"best_model_killbillV2_SGD{suffix}.pkl")
+        export_model(model, f"best_model_killbillV2_SGD{suffix}.npz", encoding)
+        return
+
+    # Load dataset (features are extracted once and cached in the feature store)
+    features_path, targets_path = build_feature_store('chess_evaluations.csv', encoding)
+    x, y = load_features(features_path), np.load(targets_path, mmap_mode="r")
+
+    # Hold out 20% of the rows for the final evaluation
+    train_rows, test_rows = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42)
+
+    # Define the models to train; the bot only runs linear models on the bitplane encoding
+    model_types = ["Linear", "Ridge", "Lasso", "DecisionTree", "RandomForest"]
+    if encoding == "bitplanes":
+        model_types = [model_type for model_type in model_types if model_type in LINEAR_MODEL_TYPES]
 
-        print(f"Evaluating {model_type} model...")
-        performance = evaluate_model(model, x_test, y_test, model_type)
+    # Choose the model type by cross-validation on the training rows, training candidates in parallel
+    best_model_type, _ = select_model(features_path, targets_path, model_types, train_rows, folds=5, time_budget=600)
 
-        # Update the best model if the current one is better
-        if performance > best_performance:
-            best_model = model
-            best_model_type = model_type
-            best_performance = performance
+    # Train the selected model on all training rows and evaluate it on the held-out rows
+    print(f"Training {best_model_type} model...")
+    best_model = train_model(x[train_rows], y[train_rows], best_model_type)
+    best_performance = evaluate_model(best_model, x[test_rows], y[test_rows], best_model_type)
 
     # Save the best model
     if best_model:
-        save_model(best_model, f"best_model_killbillV2_{best_model_type}.pkl")
+        save_model(best_model, f"best_model_killbillV2_{best_model_type}{suffix}.pkl")
+        export_model(best_model, f"best_model_killbillV2_{best_model_type}{suffix}.npz", encoding)
         print(f"Best model: {best_model_type} with performance: {best_performance}")
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+import sys
+import chess
+
+# Centipawn values used by the stand-in evaluation
+PIECE_VALUES = {chess.PAWN: 100, chess.KNIGHT: 300, chess.BISHOP: 300, chess.ROOK: 500, chess.QUEEN: 900, chess.KING: 0}
+
+
+def material(board):
+    '''
+    Returns the material balance in centipawns from the point of view of the side to move.
+    '''
+    return sum(PIECE_VALUES[piece.piece_type] * (1 if piece.color == board.turn else -1)
+               for piece in board.piece_map().values())
+
+
+def main():
+    '''
+    A minimal stand-in UCI engine for trying out fen_generator.py without Stockfish:
+    python fen_generator.py --engine ./standin_engine.py --games 20
+
+    'go' answers immediately with the material balance as the score and the first legal move.
+    '''
+    board = chess.Board()
+    for line in sys.stdin:
+        tokens = line.split()
+        if not tokens:
+            continue
+        if tokens[0] == "uci":
+            print("id name standin")
+            print("id author killbillV2")
+            print("uciok")
+        elif tokens[0] == "isready":
+            print("readyok")
+        elif tokens[0] == "position":
+            moves = tokens.index("moves") if "moves" in tokens else len(tokens)
+            if tokens[1] == "startpos":
+                board = chess.Board()
+            else:
+                board = chess.Board(" ".join(tokens[2:moves]))
+            for move in tokens[moves + 1:]:
+                board.push_uci(move)
+        elif tokens[0] == "go":
+            depth = int(tokens[tokens.index("depth") + 1]) if "depth" in tokens else 1
+            legal_moves = list(board.legal_moves)
+            if not legal_moves:
+                score = "mate 0" if board.is_check() else "cp 0"
+                print(f"info depth {depth} score {score}")
+                print("bestmove 0000")
+            else:
+                print(f"info depth {depth} score cp {material(board)} pv {legal_moves[0].uci()}")
+                print(f"bestmove {legal_moves[0].uci()}")
+        elif tokens[0] == "quit":
+            break
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Where measurements are recorded so startup regressions show up in diffs
+PROFILE_FILE = "startup_profile.json"
+
+
+def import_times(module, top=10):
+    '''
+    Imports the module in a fresh interpreter with `python -X importtime` and returns the total
+    import time in milliseconds and the slowest imports by cumulative time.
+    '''
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "").split("|")]
+        rows.append((name, int(cumulative_us)))
+    total = next((cumulative for name, cumulative in rows if name == module), 0)
+    slowest = sorted(rows, key=lambda row: row[1], reverse=True)[1:top + 1]
+    return round(total / 1000, 1), [(name, round(cumulative / 1000, 1)) for name, cumulative in slowest]
+
+
+def handshake_times(command):
+    '''
+    Starts the engine and returns the time in milliseconds until it answers 'uciok' and 'readyok'.
+    '''
+    start = time.perf_counter()
+    engine = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    engine.stdin.write("uci\nisready\n")
+    engine.stdin.flush()
+    times = {}
+    for line in engine.stdout:
+        token = line.strip()
+        if token in ("uciok", "readyok"):
+            times[token] = round((time.perf_counter() - start) * 1000, 1)
+        if token == "readyok":
+            break
+    engine.stdin.write("quit\n")
+    engine.stdin.flush()
+    engine.wait()
+    return times
+
+
+def main():
+    '''
+    Usage: python startup_profile.py [engine.py | frozen executable] [--record]
+
+    Prints the import time of the engine module and how long the engine takes to answer
+    'uciok'/'readyok'. With --record the numbers are stored in startup_profile.json.
+    '''
+    args = [arg for arg in sys.argv[1:] if arg != "--record"]
+    target = args[0] if args else "killbillV2.py"
+    if target.endswith(".py"):
+        module = os.path.splitext(os.path.basename(target))[0]
+        total_ms, slowest = import_times(module)
+        command = [sys.executable, target]
+    else:
+        total_ms, slowest = None, []
+        command = [target]
+    handshake = handshake_times(command)
+
+    if total_ms is not None:
+        print(f"import {module}: {total_ms:.1f} ms")
+        for name, cumulative_ms in slowest:
+            print(f"  {cumulative_ms:8.1f} ms  {name}")
+    print(f"uciok after {handshake.get('uciok', float('nan')):.1f} ms, "
+          f"readyok after {handshake.get('readyok', float('nan')):.1f} ms")
+
+    if "--record" in sys.argv:
+        profile = {}
+        if os.path.exists(PROFILE_FILE):
+            with open(PROFILE_FILE) as f:
+                profile = json.load(f)
+        profile[os.path.basename(target)] = {
+            "import_ms": total_ms,
+            "uciok_ms": handshake.get("uciok"),
+            "readyok_ms": handshake.get("readyok"),
+            "slowest_imports_ms": dict(slowest)
+        }
+        with open(PROFILE_FILE, "w") as f:
+            json.dump(profile, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import permutations
 from chester.timecontrol import TimeControl
-from chester.tournament import play_tournament
+from chester.match import play_match
 
 # Each string is the name/path to an executable UCI engine.
 players = ["random_chess_bot.exe", "/opt/homebrew/bin/stockfish"]
@@ -7,31 +11,185 @@ players = ["random_chess_bot.exe", "/opt/homebrew/bin/stockfish"]
 # Specify time and increment, both in seconds.
 time_control = TimeControl(initial_time=180, increment=10)
 
-# Play each math-up twice.
+# Play each match-up this many times.
 n_games = 5
 
-# Tabulate scores at the end.
-scores = {}
+# Games played at the same time. Each game runs two engine processes, so half a core per engine
+# keeps them from competing for the CPU under a real clock.
+workers = max(1, os.cpu_count() // 2)
 
-for pgn in play_tournament(
-    players,
-    time_control,
-    n_games=n_games,
-    repeat=True,  # Each opening played twice,
-):
-    # Printing out the game result.
+# Finished games are appended to this file as they come in.
+pgn_file = "tournament.pgn"
+
+# Sequential probability ratio test: when enabled the match between players[0] (the candidate)
+# and players[1] (the baseline) stops as soon as the test accepts H1 (the candidate is elo1 Elo
+# stronger) or H0 (it is at most elo0 stronger). n_games is then the maximum number of game pairs.
+sprt = False
+elo0, elo1 = 0, 10
+alpha, beta = 0.05, 0.05
+
+# The LLR estimate is unreliable on a handful of pairs, so the test never stops before this many.
+SPRT_MIN_PAIRS = 10
+
+# Pseudo-count added to each of the five possible pair scores, as fishtest does, so the variance
+# does not collapse to zero when every pair ends the same way
+SPRT_PSEUDO_COUNT = 1e-3
+
+# Points for white and black for each decisive or drawn PGN result; '*' (unfinished) scores nothing.
+RESULT_POINTS = {"1-0": (1.0, 0.0), "0-1": (0.0, 1.0), "1/2-1/2": (0.5, 0.5)}
+
+def play_game(white, black, round_number):
+    '''
+    Plays one game between two engines in a worker process and returns its PGN text and result.
+    '''
+    pgn = play_match(white, black, time_control)
     pgn.headers["Event"] = "CS5100 Tournament"
     pgn.headers["Site"] = "My Computer"
-    print(pgn, "\n")
-
-    # Update scores.
-    white = pgn.headers["White"]
-    black = pgn.headers["Black"]
-    scores.setdefault(white,0) # If bot hasn't been added start at 0.
-    scores.setdefault(black,0)
-    results = pgn.headers["Result"].split('-')
-    scores[white] += float(eval(results[0]))
-    scores[black] += float(eval(results[1]))
-
-for (bot,score) in scores.items():
-    print(bot , ":", score)
\ No newline at end of file
+    pgn.headers["Round"] = str(round_number)
+    return str(pgn), pgn.headers["Result"]
+
+def elo_difference(score):
+    '''
+    Converts an expected score between 0 and 1 into an Elo difference.
+    '''
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return 400 * math.log10(score / (1 - score))
+
+def elo_with_error(points):
+    '''
+    Returns the Elo difference implied by a list of per-game points (1, 0.5 or 0) against the
+    field, with the half-width of its 95% confidence interval. Scores are kept half a game away
+    from 0% and 100%, so a perfect score gives a finite bound rather than an infinite Elo; the
+    error is None in that case.
+    '''
+    n = len(points)
+    score = sum(points) / n
+
+    def clamp(s):
+        return min(max(s, 0.5 / n), 1 - 0.5 / n)
+
+    if score in (0, 1):
+        return elo_difference(clamp(score)), None
+    deviation = math.sqrt(sum((p - score) ** 2 for p in points) / n)
+    margin = 1.96 * deviation / math.sqrt(n)
+    low, high = elo_difference(clamp(score - margin)), elo_difference(clamp(score + margin))
+    return elo_difference(score), (high - low) / 2
+
+def print_standings(points, games_done, games_total):
+    '''
+    Prints every player's score and Elo against the rest of the field, best first.
+    '''
+    print(f"Standings after {games_done}/{games_total} games:")
+    for bot, bot_points in sorted(points.items(), key=lambda item: sum(item[1]) / max(1, len(item[1])), reverse=True):
+        if not bot_points:
+            continue
+        elo, error = elo_with_error(bot_points)
+        if error is None:
+            # Perfect or zero score: only a bound on the Elo difference is known
+            rating = f"Elo {'>' if elo > 0 else '<'} {elo:+.0f}"
+        else:
+            rating = f"Elo {elo:+.0f} +/- {error:.0f}"
+        print(f"  {bot}: {sum(bot_points)}/{len(bot_points)}, {rating}")
+
+def sprt_bounds(alpha, beta):
+    '''
+    Returns the lower and upper LLR bounds at which the test accepts H0 and H1.
+    '''
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+def expected_score(elo):
+    '''
+    Returns the expected score of a player who is `elo` Elo stronger than its opponent.
+    '''
+    return 1 / (1 + 10 ** (-elo / 400))
+
+def sprt_llr(pair_scores, elo0, elo1):
+    '''
+    Returns the log-likelihood ratio of H1 (elo1) against H0 (elo0) given the candidate's score in
+    each game pair (0 to 2 points for playing both colors). Uses the normal approximation of the
+    generalized SPRT on the pentanomial distribution of pair scores, so it already accounts for
+    draws and color balance.
+    '''
+    n = len(pair_scores)
+    if n == 0:
+        return 0.0
+    outcomes = [0.0, 0.5, 1.0, 1.5, 2.0]
+    counts = [pair_scores.count(outcome) + SPRT_PSEUDO_COUNT for outcome in outcomes]
+    total = sum(counts)
+    mean = sum(count * outcome / 2 for count, outcome in zip(counts, outcomes)) / total
+    variance = sum(count * (outcome / 2 - mean) ** 2 for count, outcome in zip(counts, outcomes)) / total
+    s0, s1 = expected_score(elo0), expected_score(elo1)
+    return n * (s1 - s0) * (2 * mean - s0 - s1) / (2 * variance)
+
+def main():
+    '''
+    Plays every pairing (both colors) n_games times, running up to `workers` games at once, and
+    prints the standings after each finished game; a game that fails is reported and left unscored.
+    With sprt enabled it logs the LLR after each completed game pair and stops the match once a
+    bound is crossed.
+    '''
+    if sprt and len(players) != 2:
+        raise ValueError("SPRT needs exactly two players: the candidate and the baseline")
+    if sprt and n_games < SPRT_MIN_PAIRS:
+        raise ValueError(f"SPRT cannot stop before {SPRT_MIN_PAIRS} game pairs; "
+                         f"raise n_games (the maximum number of pairs) from {n_games}")
+    games = [(white, black, round_number)
+             for round_number in range(1, n_games + 1)
+             for white, black in permutations(players, 2)]
+    points = {bot: [] for bot in players}  # Per-game points of each bot
+    candidate = players[0]
+    round_points = {}  # Round number -> candidate's points in the finished games of that pair
+    pair_scores = []
+    lower, upper = sprt_bounds(alpha, beta)
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(pgn_file, "a") as pgn_output:
+        futures = {pool.submit(play_game, *game): game for game in games}
+        games_done = 0
+        decided = False
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            white, black, round_number = futures[future]
+            try:
+                pgn, result = future.result()
+            except Exception as e:
+                # An engine crash or a failed match loses this game only, not the tournament
+                print(f"Game {white} vs {black} (round {round_number}) failed: {e!r}")
+                if not decided:
+                    games_done += 1
+                    print_standings(points, games_done, len(games))
+                continue
+            # Printing out the game result and saving it straight away.
+            print(pgn, "\n")
+            pgn_output.write(pgn + "\n\n")
+            pgn_output.flush()
+            if decided:
+                continue  # Already running when the test finished; kept in the PGN but not scored
+
+            # Update scores; unfinished games do not count.
+            games_done += 1
+            if result in RESULT_POINTS:
+                white_points, black_points = RESULT_POINTS[result]
+                points[white].append(white_points)
+                points[black].append(black_points)
+            print_standings(points, games_done, len(games))
+
+            if sprt and result in RESULT_POINTS:
+                round_points.setdefault(round_number, []).append(white_points if white == candidate else black_points)
+                if len(round_points[round_number]) == 2:
+                    pair_scores.append(sum(round_points.pop(round_number)))
+                    llr = sprt_llr(pair_scores, elo0, elo1)
+                    print(f"SPRT pair {len(pair_scores)} (round {round_number}): {pair_scores[-1]}/2, "
+                          f"LLR {llr:.2f} [{lower:.2f}, {upper:.2f}]")
+                    if len(pair_scores) >= SPRT_MIN_PAIRS and (llr <= lower or llr >= upper):
+                        hypothesis = "H1" if llr >= upper else "H0"
+                        print(f"SPRT accepted {hypothesis} (elo0={elo0}, elo1={elo1}) after "
+                              f"{len(pair_scores)} game pairs; stopping the match")
+                        decided = True
+                        for pending in futures:
+                            pending.cancel()
+
+if __name__ == "__main__":
+    main()